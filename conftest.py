@@ -0,0 +1 @@
+# Makes the project root importable (``src``) when running pytest
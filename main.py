@@ -4,34 +4,112 @@ Orchestrates the scraping process and runs the main loop.
 """
 
 import time
-from src.config import BOT_NAME, SCRAPE_INTERVAL
+from typing import Optional
+from src.config import BOT_NAME, SCRAPE_INTERVAL, ENDPOINT_BUILDER_ENABLED
 from src.utils import setup_logger
 from src.browser import browser_automation
+from src.endpoint_cache import endpoint_cache
+from src.endpoint_builder import endpoint_builder
 from src.scraper import scraper
 from src.database import db_manager
 from src.notifier import notifier
+from src.searches import Search, load_searches
 
 logger = setup_logger(__name__)
 
 
-def run_scraper_cycle():
-    """Run a single scraping cycle."""
+def build_json_endpoint(search: Search) -> Optional[str]:
+    """
+    Build and check the JSON endpoint of a search without the browser.
+
+    Args:
+        search: Search to build the endpoint for
+
+    Returns:
+        Working JSON endpoint URL, or None if it could not be built
+    """
+    json_endpoint = endpoint_builder.build_endpoint(search.url, search.sort)
+    if json_endpoint is None or endpoint_cache.validate(json_endpoint):
+        return json_endpoint
+
+    # The site may have been redeployed since the build ID was read
+    endpoint_builder.invalidate(search.url)
+    json_endpoint = endpoint_builder.build_endpoint(search.url, search.sort)
+    if json_endpoint is None or endpoint_cache.validate(json_endpoint):
+        return json_endpoint
+    return None
+
+
+def resolve_json_endpoint(search: Search) -> Optional[str]:
+    """
+    Find the JSON endpoint of a search.
+
+    The cached endpoint is used while it is fresh; otherwise the endpoint
+    is built from the search parameters, and the browser is only started
+    if that fails.
+
+    Args:
+        search: Search to find the endpoint for
+
+    Returns:
+        JSON endpoint URL, or None if it could not be found
+    """
+    json_endpoint = endpoint_cache.get(search.cache_key)
+    if json_endpoint is not None:
+        return json_endpoint
+
+    if ENDPOINT_BUILDER_ENABLED:
+        json_endpoint = build_json_endpoint(search)
+        if json_endpoint is None:
+            logger.info("Could not build JSON endpoint, falling back to the browser")
+    if json_endpoint is None:
+        json_endpoint = browser_automation.find_json_endpoint(search.url, search.sort)
+
+    if json_endpoint:
+        endpoint_cache.set(search.cache_key, json_endpoint)
+    return json_endpoint
+
+
+def run_scraper_cycle(search: Search) -> Optional[int]:
+    """
+    Run a single scraping cycle for one search.
+
+    Args:
+        search: Search to scrape
+
+    Returns:
+        Number of new cars found, or None if the cycle failed
+    """
+    new_cars = None
     try:
-        logger.info(f"{BOT_NAME} - Starting scraping cycle")
+        logger.info(f"{BOT_NAME} - Starting scraping cycle for search '{search.name}'")
 
-        # Find JSON endpoint
-        json_endpoint = browser_automation.find_json_endpoint()
+        json_endpoint = resolve_json_endpoint(search)
 
         if json_endpoint:
-            # Scrape listings
-            new_cars = scraper.scrape_listings(json_endpoint)
-            logger.info(f"Scraping cycle completed. New cars: {new_cars}")
+            # Scrape listings; listings already stored by another search
+            # are recognized by ID and not reported again
+            new_cars = scraper.scrape_listings(json_endpoint, search.pages, search.mode)
+            if scraper.last_endpoint_failed:
+                # The endpoint stopped working (e.g. after a redeploy);
+                # rediscover it and retry once
+                logger.info(f"JSON endpoint of '{search.name}' failed, rediscovering it")
+                endpoint_cache.invalidate(search.cache_key)
+                json_endpoint = resolve_json_endpoint(search)
+                if json_endpoint:
+                    new_cars = scraper.scrape_listings(json_endpoint, search.pages, search.mode)
+            logger.info(f"Scraping cycle for '{search.name}' completed. New cars: {new_cars}")
+            if scraper.last_scrape_failed:
+                new_cars = None
         else:
-            error_message = f"{BOT_NAME} - Could not find JSON endpoint, skipping this cycle"
+            error_message = f"{BOT_NAME} - Could not find JSON endpoint for '{search.name}', skipping this cycle"
             logger.warning(error_message)
 
-        # Clean up old listings
-        deleted = db_manager.delete_old_cars(days=7)
+        # Record listings that were seen unchanged this cycle
+        db_manager.flush_seen()
+
+        # Clean up old listings (runs at most every RETENTION_INTERVAL)
+        deleted = db_manager.run_retention()
         if deleted > 0:
             logger.info(f"Deleted {deleted} old car listings")
 
@@ -39,44 +117,80 @@ def run_scraper_cycle():
         total_cars = db_manager.get_car_count()
         logger.info(f"Total cars in database: {total_cars}")
 
+        # Report errors that were aggregated during the last window
+        notifier.flush_error_summaries()
+
     except Exception as e:
         error_message = f"{BOT_NAME} - Error in scraping cycle: {e}"
         logger.error(error_message)
         notifier.send_error(error_message)
+        new_cars = None
+
+    return new_cars
 
 
 def main():
     """Main function - runs the scraper in an infinite loop."""
     logger.info(f"{BOT_NAME} - Starting up...")
-    logger.info(f"Scrape interval: {SCRAPE_INTERVAL} seconds")
+    logger.info(f"Base scrape interval: {SCRAPE_INTERVAL} seconds")
+
+    # All searches share the browser, the HTTP session and the database
+    searches = load_searches()
+
+    # Keep one database connection open for the lifetime of the process;
+    # the browser is started lazily and kept warm between discoveries
+    db_manager.open()
 
     # Send startup notification
     notifier.send_info(f"{BOT_NAME} has started successfully!")
 
     cycle_count = 0
 
-    while True:
-        try:
-            cycle_count += 1
-            logger.info(f"\n{'='*50}")
-            logger.info(f"Cycle #{cycle_count}")
-            logger.info(f"{'='*50}\n")
-
-            run_scraper_cycle()
-
-            logger.info(f"Waiting {SCRAPE_INTERVAL} seconds until next cycle...\n")
-            time.sleep(SCRAPE_INTERVAL)
-
-        except KeyboardInterrupt:
-            logger.info(f"{BOT_NAME} - Shutting down gracefully...")
-            notifier.send_info(f"{BOT_NAME} has been stopped.")
-            break
-        except Exception as e:
-            error_message = f"{BOT_NAME} - Critical error in main loop: {e}"
-            logger.error(error_message)
-            notifier.send_error(error_message)
-            logger.info("Waiting before retry...")
-            time.sleep(SCRAPE_INTERVAL)
+    try:
+        while True:
+            try:
+                # Run whichever search is due first
+                search = min(searches, key=lambda s: s.next_run)
+                wait = search.next_run - time.monotonic()
+                if wait > 0:
+                    logger.info(f"Waiting {wait:.0f} seconds until next cycle ('{search.name}')...\n")
+                    time.sleep(wait)
+
+                cycle_count += 1
+                logger.info(f"\n{'='*50}")
+                logger.info(f"Cycle #{cycle_count} - {search.name}")
+                logger.info(f"{'='*50}\n")
+
+                started_at = time.time()
+                cycle_start = time.monotonic()
+                new_cars = run_scraper_cycle(search)
+
+                delay = search.scheduler.record_cycle(
+                    started_at,
+                    time.monotonic() - cycle_start,
+                    new_cars,
+                    retry_after=scraper.last_retry_after
+                )
+                search.next_run = time.monotonic() + delay
+                if scraper.last_retry_after:
+                    # The throttling applies to the host, so every search has to wait
+                    for other in searches:
+                        other.next_run = max(other.next_run, time.monotonic() + scraper.last_retry_after)
+
+            except KeyboardInterrupt:
+                logger.info(f"{BOT_NAME} - Shutting down gracefully...")
+                notifier.send_info(f"{BOT_NAME} has been stopped.")
+                break
+            except Exception as e:
+                error_message = f"{BOT_NAME} - Critical error in main loop: {e}"
+                logger.error(error_message)
+                notifier.send_error(error_message)
+                logger.info("Waiting before retry...")
+                time.sleep(SCRAPE_INTERVAL)
+    finally:
+        browser_automation.close()
+        db_manager.close()
+        notifier.close()
 
 
 if __name__ == "__main__":
@@ -3,95 +3,300 @@ Browser automation module using Playwright.
 Handles browser operations to find JSON endpoints.
 """
 
-from typing import Optional
-from playwright.sync_api import sync_playwright, Browser, Page
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+from playwright.sync_api import (
+    sync_playwright,
+    Browser,
+    Playwright,
+    Route,
+    TimeoutError as PlaywrightTimeoutError
+)
 from src.config import (
     BOT_NAME,
     AUTOSCOUT_SEARCH_URL,
     BROWSER_HEADLESS,
     BROWSER_TIMEOUT,
+    BROWSER_MAX_USES,
+    BROWSER_MEMORY_LIMIT_MB,
     SORT_DROPDOWN_SELECTOR,
     SORT_OPTION,
-    JSON_ENDPOINT_PATTERN
+    JSON_ENDPOINT_PATTERN,
+    BLOCKED_RESOURCE_TYPES,
+    ALLOWED_DOMAINS,
+    BLOCKED_DOMAINS
 )
 from src.utils import setup_logger
 from src.notifier import notifier
 
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional dependency
+    psutil = None
+
 logger = setup_logger(__name__)
 
 
+class RequestFilter:
+    """Allow/deny policy for requests made during endpoint discovery."""
+
+    def __init__(
+        self,
+        blocked_resource_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+        allowed_domains: Iterable[str] = ALLOWED_DOMAINS,
+        blocked_domains: Iterable[str] = BLOCKED_DOMAINS
+    ):
+        """
+        Initialize request filter.
+
+        Args:
+            blocked_resource_types: Playwright resource types to abort
+            allowed_domains: Domains that may be requested; empty allows all
+            blocked_domains: Domains that are always aborted
+        """
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.allowed_domains = tuple(allowed_domains)
+        self.blocked_domains = tuple(blocked_domains)
+        self.blocked_count = 0
+
+    @staticmethod
+    def _matches(host: str, domains: tuple) -> bool:
+        """
+        Check whether a host equals or is a subdomain of any given domain.
+
+        Args:
+            host: Request host name
+            domains: Domains to match against
+
+        Returns:
+            True if the host matches
+        """
+        return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """
+        Decide whether a request should be aborted.
+
+        Args:
+            resource_type: Playwright resource type of the request
+            url: Request URL
+
+        Returns:
+            True if the request should be blocked
+        """
+        if resource_type == "document":
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+
+        host = urlsplit(url).hostname or ""
+        if self._matches(host, self.blocked_domains):
+            return True
+        if self.allowed_domains and not self._matches(host, self.allowed_domains):
+            return True
+        return False
+
+    def handle_route(self, route: Route):
+        """
+        Playwright route handler applying the policy.
+
+        Args:
+            route: Intercepted route
+        """
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked_count += 1
+            route.abort()
+        else:
+            route.continue_()
+
+
 class BrowserAutomation:
-    """Handles browser automation to extract JSON endpoints."""
+    """
+    Handles browser automation to extract JSON endpoints.
+
+    A single Chromium process is kept warm across cycles and every
+    discovery runs in a fresh browser context. The browser is recycled
+    after ``max_uses`` discoveries or when its memory exceeds the
+    configured ceiling, and restarted if it crashes.
+    """
 
     def __init__(self):
         self.headless = BROWSER_HEADLESS
         self.timeout = BROWSER_TIMEOUT
         self.search_url = AUTOSCOUT_SEARCH_URL
+        self.max_uses = BROWSER_MAX_USES
+        self.memory_limit_mb = BROWSER_MEMORY_LIMIT_MB
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._uses = 0
+        self.request_filter = RequestFilter()
 
-    def find_json_endpoint(self) -> Optional[str]:
+    def _get_browser(self) -> Browser:
+        """
+        Get the warm browser, starting or recycling it when needed.
+
+        Returns:
+            Running browser instance
+        """
+        if self._browser is not None:
+            if not self._browser.is_connected():
+                logger.warning("Browser is no longer connected, restarting it")
+                self._shutdown_browser()
+            elif self._needs_recycle():
+                self._shutdown_browser()
+
+        if self._browser is None:
+            self._start_browser()
+
+        self._uses += 1
+        return self._browser
+
+    def _start_browser(self):
+        """Launch the Chromium process."""
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        logger.info("Launching browser...")
+        self._browser = self._playwright.chromium.launch(headless=self.headless)
+        self._uses = 0
+
+    def _needs_recycle(self) -> bool:
+        """
+        Check whether the browser should be replaced by a fresh process.
+
+        Returns:
+            True if the use count or memory ceiling has been reached
+        """
+        if self._uses >= self.max_uses:
+            logger.info(f"Recycling browser after {self._uses} uses")
+            return True
+
+        memory_mb = self._browser_memory_mb()
+        if memory_mb is not None and memory_mb > self.memory_limit_mb:
+            logger.info(f"Recycling browser using {memory_mb:.0f} MB of memory")
+            return True
+
+        return False
+
+    @staticmethod
+    def _browser_memory_mb() -> Optional[float]:
+        """
+        Measure the memory used by the browser and driver processes.
+
+        Returns:
+            Resident memory in MB, or None if psutil is not installed
+        """
+        if psutil is None:
+            return None
+        try:
+            children = psutil.Process().children(recursive=True)
+            return sum(child.memory_info().rss for child in children) / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    def _shutdown_browser(self):
+        """Close the browser process, ignoring errors from a crashed browser."""
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception as e:
+                logger.debug(f"Error while closing browser: {e}")
+            self._browser = None
+            self._uses = 0
+
+    def close(self):
+        """Close the browser and stop Playwright."""
+        self._shutdown_browser()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"Error while stopping Playwright: {e}")
+            self._playwright = None
+
+    def find_json_endpoint(self, search_url: Optional[str] = None, sort_option: Optional[str] = None) -> Optional[str]:
         """
         Find the JSON endpoint by monitoring network requests.
 
+        Args:
+            search_url: Search page to load (defaults to AUTOSCOUT_SEARCH_URL)
+            sort_option: Sort dropdown value to select (defaults to SORT_OPTION)
+
         Returns:
             JSON endpoint URL if found, None otherwise
         """
+        search_url = search_url or self.search_url
+        sort_option = sort_option or SORT_OPTION
         json_endpoint = None
+        context = None
+        self.request_filter.blocked_count = 0
 
         try:
-            with sync_playwright() as playwright:
-                browser = playwright.chromium.launch(headless=self.headless)
-                context = browser.new_context()
-                page = context.new_page()
+            browser = self._get_browser()
+            context = browser.new_context()
+            # Only download what is needed to trigger the JSON request
+            context.route("**/*", self.request_filter.handle_route)
+            page = context.new_page()
 
-                # Set up response handler to capture JSON endpoint
-                def handle_response(response):
-                    nonlocal json_endpoint
-                    if JSON_ENDPOINT_PATTERN in response.url:
-                        json_endpoint = response.url
-                        logger.debug(f"Found JSON endpoint: {response.url}")
+            # Navigate to the search page and wait for the load event, so the
+            # page's scripts have attached the dropdown's handlers; heavy
+            # assets are blocked, which keeps this wait short
+            try:
+                logger.info("Loading AutoScout24 search page...")
+                page.goto(search_url, timeout=self.timeout)
+            except Exception as e:
+                error_message = f"{BOT_NAME} - Page loading error: {str(e)}"
+                logger.error(error_message)
+                notifier.send_error(error_message)
+                return None
 
-                page.on("response", handle_response)
-
-                # Navigate to the search page
+            # Select sort option and return as soon as the JSON response arrives;
+            # the timeout is only an upper bound
+            try:
+                logger.info("Selecting sort option...")
+                page.wait_for_selector(SORT_DROPDOWN_SELECTOR, timeout=self.timeout)
                 try:
-                    logger.info("Loading AutoScout24 search page...")
-                    page.goto(self.search_url, timeout=self.timeout)
-                except Exception as e:
-                    error_message = f"{BOT_NAME} - Page loading error: {str(e)}"
-                    logger.error(error_message)
-                    notifier.send_error(error_message)
-                    browser.close()
-                    return None
+                    with page.expect_response(
+                        lambda response: JSON_ENDPOINT_PATTERN in response.url,
+                        timeout=self.timeout
+                    ) as response_info:
+                        page.select_option(SORT_DROPDOWN_SELECTOR, sort_option)
+                    json_endpoint = response_info.value.url
+                    logger.debug(f"Found JSON endpoint: {json_endpoint}")
+                except PlaywrightTimeoutError:
+                    # No matching response before the timeout; reported below
+                    pass
+            except Exception as e:
+                error_message = f"{BOT_NAME} - Dropdown selection error: {str(e)}"
+                logger.error(error_message)
+                notifier.send_error(error_message)
+                return None
 
-                # Select sort option and wait for network to be idle
-                try:
-                    logger.info("Selecting sort option...")
-                    page.select_option(SORT_DROPDOWN_SELECTOR, SORT_OPTION)
-                    page.wait_for_load_state("networkidle", timeout=self.timeout)
-                except Exception as e:
-                    error_message = f"{BOT_NAME} - Dropdown selection error: {str(e)}"
-                    logger.error(error_message)
-                    notifier.send_error(error_message)
-                    browser.close()
-                    return None
-
-                browser.close()
-
-                if json_endpoint is None:
-                    error_message = f"{BOT_NAME} - JSON endpoint not found in network requests"
-                    logger.error(error_message)
-                    notifier.send_error(error_message)
-                else:
-                    logger.info("JSON endpoint found successfully")
+            if json_endpoint is None:
+                error_message = f"{BOT_NAME} - JSON endpoint not found in network requests"
+                logger.error(error_message)
+                notifier.send_error(error_message)
+            else:
+                logger.info("JSON endpoint found successfully")
 
-                return json_endpoint
+            return json_endpoint
 
         except Exception as e:
             error_message = f"{BOT_NAME} - Browser automation error: {str(e)}"
             logger.error(error_message)
             notifier.send_error(error_message)
+            # Start from a fresh process next time in case the browser crashed
+            self._shutdown_browser()
             return None
 
+        finally:
+            logger.debug(f"Blocked {self.request_filter.blocked_count} requests during discovery")
+            if context is not None:
+                try:
+                    context.close()
+                except Exception as e:
+                    logger.debug(f"Error while closing browser context: {e}")
+
 
 # Global browser automation instance
 browser_automation = BrowserAutomation()
@@ -13,6 +13,14 @@ load_dotenv()
 BOT_NAME = "AutoScout Bot"
 SCRAPE_INTERVAL = 60  # seconds
 
+# Adaptive scheduling settings
+ADAPTIVE_SCHEDULING = True  # False keeps a fixed SCRAPE_INTERVAL between cycle starts
+MIN_SCRAPE_INTERVAL = 20  # seconds
+MAX_SCRAPE_INTERVAL = 600  # seconds
+TARGET_NEW_LISTINGS_PER_CYCLE = 2  # interval is sized so a cycle finds about this many
+ARRIVAL_RATE_SMOOTHING = 0.3  # weight of the latest cycle in the per-hour arrival rate
+MAX_INTERVAL_GROWTH = 1.5  # factor the interval may grow by after one cycle
+
 # AutoScout24 settings
 AUTOSCOUT_BASE_URL = "https://www.autoscout24.de"
 AUTOSCOUT_SEARCH_URL = (
@@ -21,15 +29,54 @@ AUTOSCOUT_SEARCH_URL = (
     "sort=leasing_rate&source=homepage_search-mask&ustate=N%2CU"
 )
 
+# Search registry: JSON list of named searches; without it AUTOSCOUT_SEARCH_URL is used
+SEARCHES_FILE = os.getenv("SEARCHES_FILE", "searches.json")
+
 # Browser settings
 BROWSER_HEADLESS = True
 BROWSER_TIMEOUT = 60000  # milliseconds
 SORT_DROPDOWN_SELECTOR = "#sort-dropdown-select"
 SORT_OPTION = "age-descending"
+BROWSER_MAX_USES = 50  # discoveries before the browser process is recycled
+BROWSER_MEMORY_LIMIT_MB = 1024  # RSS ceiling before the browser is recycled (needs psutil)
+
+# Request interception during endpoint discovery
+BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "stylesheet", "texttrack", "eventsource", "manifest"]
+# Only these domains (and their subdomains) may be requested; empty allows all
+ALLOWED_DOMAINS = ["autoscout24.de", "autoscout24.com", "autoscout24.net"]
+# These domains (and their subdomains) are always blocked
+BLOCKED_DOMAINS = [
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "facebook.net",
+    "criteo.com",
+    "adnxs.com",
+    "hotjar.com"
+]
 
 # Scraping settings
 PAGES_TO_SCRAPE = [1, 2]
 JSON_ENDPOINT_PATTERN = "lst.json"
+SCRAPE_CONCURRENCY = 4  # pages fetched in parallel
+# "incremental" stops paging once a page holds only known listings; "full" fetches every page
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "incremental")
+INCREMENTAL_OVERLAP_PAGES = 1  # extra pages fetched after the first fully known page
+REQUESTS_PER_SECOND_PER_HOST = 4.0
+REQUEST_TIMEOUT = 30  # seconds
+PAGE_CACHE_SIZE = 256  # page URLs whose ETag, Last-Modified and body hash are remembered
+
+# JSON backend: "auto" picks orjson, then msgspec, then the standard library
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+# Endpoint cache settings
+ENDPOINT_CACHE_FILE = "endpoint_cache.json"
+ENDPOINT_CACHE_TTL = 6 * 60 * 60  # seconds
+ENDPOINT_VALIDATION_TIMEOUT = 15  # seconds
+# Build lst.json URLs from the site's build ID before falling back to the browser
+ENDPOINT_BUILDER_ENABLED = True
+BUILD_ID_MAX_BYTES = 1048576  # search page bytes read while looking for the Next.js build ID
 
 # User-Agent rotation
 USER_AGENTS = [
@@ -43,10 +90,42 @@ USER_AGENTS = [
 TELEGRAM_API_KEY = os.getenv("TELEGRAM_API_KEY")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 TELEGRAM_ENABLED = bool(TELEGRAM_API_KEY and TELEGRAM_CHAT_ID)
+TELEGRAM_QUEUE_SIZE = 1000  # messages waiting to be sent
+TELEGRAM_BATCH_WINDOW = 2.0  # seconds to wait for more messages to batch
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096  # Telegram's limit per message
+TELEGRAM_CHAT_INTERVAL = 1.0  # minimum seconds between messages to one chat
+TELEGRAM_GLOBAL_RATE = 30  # maximum messages per second across all chats
+TELEGRAM_MAX_RETRIES = 3
+TELEGRAM_RETRY_BACKOFF = 2.0  # seconds, doubled after each failed attempt
+TELEGRAM_SHUTDOWN_TIMEOUT = 15  # seconds to drain the queue on shutdown
+ERROR_DEDUP_WINDOW = 600  # seconds identical errors are aggregated into one alert
+ERROR_ALERTS_PER_MINUTE = 2  # sustained rate of outgoing error alerts
+ERROR_ALERT_BURST = 5  # error alerts that may be sent back to back
 
 # Database settings
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///autoscout.db")
 DB_TABLE_NAME = "car_listings"
+DB_FEATURES_TABLE_NAME = "car_features"
+DB_ARCHIVE_TABLE_NAME = "car_listings_archive"
+DB_PRICE_HISTORY_TABLE_NAME = "price_history"
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE_KB = 16384  # page cache size in KiB
+DB_MMAP_SIZE = 134217728  # bytes (128 MiB)
+DB_BUSY_TIMEOUT = 30  # seconds
+DB_STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+DB_POOL_MIN_SIZE = 1  # PostgreSQL connections kept open
+DB_POOL_MAX_SIZE = 5  # PostgreSQL connections opened at most
+DB_COPY_THRESHOLD = 200  # PostgreSQL batches of at least this many rows are loaded with COPY
+
+# Retention settings
+RETENTION_DAYS = 7  # listings not seen for this long are removed
+RETENTION_INTERVAL = 3600  # seconds between retention runs
+RETENTION_BATCH_SIZE = 500  # rows deleted per transaction
+# "" deletes expired listings, "table" moves them to a compressed archive table,
+# "file" appends them to gzipped JSON lines files in RETENTION_ARCHIVE_DIR
+RETENTION_ARCHIVE = os.getenv("RETENTION_ARCHIVE", "")
+RETENTION_ARCHIVE_DIR = "archive"
 
 # Logging settings
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
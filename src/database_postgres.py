@@ -0,0 +1,467 @@
+"""
+PostgreSQL storage backend for car listings.
+Used when DATABASE_URL points at a PostgreSQL server, so several scraper
+instances can share one store.
+"""
+
+import io
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from src.config import (
+    DB_TABLE_NAME,
+    DB_FEATURES_TABLE_NAME,
+    DB_ARCHIVE_TABLE_NAME,
+    DB_PRICE_HISTORY_TABLE_NAME,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_COPY_THRESHOLD,
+    RETENTION_BATCH_SIZE,
+    RETENTION_ARCHIVE
+)
+from src.storage import BaseDatabaseManager, ListingRow, PriceDrop, SCHEMA_VERSION
+from src.utils import setup_logger
+from src.notifier import notifier
+
+try:
+    import psycopg2
+    from psycopg2 import extras as pg_extras
+    from psycopg2 import pool as pg_pool
+except ImportError:  # pragma: no cover - optional dependency
+    psycopg2 = None
+
+logger = setup_logger(__name__)
+
+# Listing columns in the order of BaseDatabaseManager._listing_row
+LISTING_COLUMNS = (
+    "id", "make", "model", "model_version", "model_and_make", "price", "price_cents",
+    "currency", "mileage_km", "registration_year", "registration_month", "power_kw",
+    "fuel", "transmission", "transmission_type", "link", "image", "company", "content_hash"
+)
+
+# Key of the advisory lock serializing schema setup across instances
+SCHEMA_LOCK_ID = 0x6173_3234
+
+# Escapes for COPY's text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+# Rows another instance already brought to the same content are left alone
+_UPSERT_CLAUSE = "ON CONFLICT (id) DO UPDATE SET " + ", ".join(
+    f"{column} = excluded.{column}" for column in LISTING_COLUMNS[1:]
+) + (
+    ", last_seen = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP"
+    f" WHERE {DB_TABLE_NAME}.content_hash IS DISTINCT FROM excluded.content_hash"
+)
+
+# Appends the price rows in {source}, aliased p, that differ from the latest
+# recorded price of their listing
+_PRICE_CHANGES_QUERY = f"""
+    INSERT INTO {DB_PRICE_HISTORY_TABLE_NAME} (listing_id, price_cents, currency)
+    SELECT p.listing_id, p.price_cents, p.currency FROM {{source}}
+    WHERE p.price_cents IS DISTINCT FROM (
+        SELECT h.price_cents FROM {DB_PRICE_HISTORY_TABLE_NAME} h
+        WHERE h.listing_id = p.listing_id
+        ORDER BY h.observed_at DESC
+        LIMIT 1
+    )
+"""
+
+
+def _copy_line(row: Sequence[Any]) -> str:
+    """
+    Encode a row as a line of COPY text format.
+
+    Args:
+        row: Column values
+
+    Returns:
+        Tab separated line with NULLs and special characters escaped
+    """
+    return "\t".join(
+        "\\N" if value is None else str(value).translate(_COPY_ESCAPES)
+        for value in row
+    ) + "\n"
+
+
+class PostgresDatabaseManager(BaseDatabaseManager):
+    """
+    PostgreSQL storage backend.
+
+    Connections come from a thread-safe pool. Large batches are loaded with
+    ``COPY`` into a staging table and upserted from there, small ones with a
+    multi-row ``INSERT``; inserts and updates are told apart by the database
+    itself, so concurrent instances never report the same listing as new.
+    Price changes are detected against the stored history and rows already
+    at the written content are not rewritten, so instances sharing the
+    database do not duplicate each other's work.
+    """
+
+    errors = (psycopg2.Error,) if psycopg2 is not None else ()
+    detects_price_changes_in_memory = False
+
+    def __init__(self, dsn: str):
+        """
+        Initialize database manager.
+
+        Args:
+            dsn: PostgreSQL connection URL
+
+        Raises:
+            ImportError: If psycopg2 is not installed
+        """
+        if psycopg2 is None:
+            raise ImportError("PostgreSQL support requires psycopg2: pip install psycopg2-binary")
+        super().__init__()
+        self.dsn = dsn
+        self._pool: Optional["pg_pool.ThreadedConnectionPool"] = None
+
+    def open(self) -> "PostgresDatabaseManager":
+        """
+        Open the connection pool if it is not open yet.
+
+        Returns:
+            The database manager itself
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = pg_pool.ThreadedConnectionPool(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, self.dsn)
+                logger.info("PostgreSQL connection pool opened")
+                self._create_tables()
+        return self
+
+    def close(self):
+        """Close all pooled connections."""
+        with self._lock:
+            if self._pool is not None:
+                self.flush_seen()
+                self._pool.closeall()
+                self._pool = None
+                logger.info("PostgreSQL connection pool closed")
+
+    @contextmanager
+    def _transaction(self) -> Iterator["psycopg2.extensions.cursor"]:
+        """
+        Borrow a pooled connection and run one transaction on it.
+
+        Yields:
+            Cursor of the borrowed connection; the transaction is committed
+            on success and rolled back on error
+        """
+        if self._pool is None:
+            self.open()
+        pool = self._pool
+        conn = pool.getconn()
+        try:
+            with conn, conn.cursor() as cursor:
+                yield cursor
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+
+    def _create_tables(self):
+        """Create the schema if it doesn't exist."""
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_ID,))
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {DB_TABLE_NAME} (
+                        id TEXT PRIMARY KEY,
+                        make TEXT,
+                        model TEXT,
+                        model_version TEXT,
+                        model_and_make TEXT,
+                        price TEXT,
+                        price_cents BIGINT,
+                        currency TEXT,
+                        mileage_km INTEGER,
+                        registration_year SMALLINT,
+                        registration_month SMALLINT,
+                        power_kw INTEGER,
+                        fuel TEXT,
+                        transmission TEXT,
+                        transmission_type TEXT,
+                        link TEXT,
+                        image TEXT,
+                        company TEXT,
+                        content_hash TEXT,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        last_seen TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {DB_FEATURES_TABLE_NAME} (
+                        listing_id TEXT NOT NULL REFERENCES {DB_TABLE_NAME} (id) ON DELETE CASCADE,
+                        name TEXT NOT NULL,
+                        value TEXT,
+                        PRIMARY KEY (listing_id, name)
+                    )
+                """)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {DB_ARCHIVE_TABLE_NAME} (
+                        id TEXT NOT NULL,
+                        archived_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        payload BYTEA NOT NULL
+                    )
+                """)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {DB_PRICE_HISTORY_TABLE_NAME} (
+                        listing_id TEXT NOT NULL REFERENCES {DB_TABLE_NAME} (id) ON DELETE CASCADE,
+                        price_cents BIGINT NOT NULL,
+                        currency TEXT,
+                        observed_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                for name, table, columns in (
+                    (f"idx_{DB_TABLE_NAME}_make_model", DB_TABLE_NAME, "make, model, price_cents"),
+                    (f"idx_{DB_TABLE_NAME}_price", DB_TABLE_NAME, "price_cents"),
+                    (f"idx_{DB_TABLE_NAME}_updated_at", DB_TABLE_NAME, "updated_at"),
+                    (f"idx_{DB_TABLE_NAME}_transmission", DB_TABLE_NAME, "transmission_type, price_cents"),
+                    (f"idx_{DB_TABLE_NAME}_last_seen", DB_TABLE_NAME, "last_seen"),
+                    (f"idx_{DB_FEATURES_TABLE_NAME}_name_value", DB_FEATURES_TABLE_NAME, "name, value"),
+                    (f"idx_{DB_PRICE_HISTORY_TABLE_NAME}_listing_observed", DB_PRICE_HISTORY_TABLE_NAME,
+                     "listing_id, observed_at"),
+                    (f"idx_{DB_PRICE_HISTORY_TABLE_NAME}_observed_at", DB_PRICE_HISTORY_TABLE_NAME,
+                     "observed_at, listing_id")
+                ):
+                    cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+                # Same numbering as the SQLite user_version, for future migrations
+                cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+                cursor.execute("SELECT version FROM schema_version")
+                if cursor.fetchone() is None:
+                    cursor.execute("INSERT INTO schema_version (version) VALUES (%s)", (SCHEMA_VERSION,))
+            logger.info("Database tables verified/created successfully")
+        except psycopg2.Error as e:
+            error_msg = f"Database table creation error: {e}"
+            logger.error(error_msg)
+            notifier.send_error(error_msg)
+
+    @staticmethod
+    def _copy_rows(cursor, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]):
+        """
+        Load rows into a table with COPY.
+
+        Args:
+            cursor: Cursor inside the current transaction
+            table: Target table
+            columns: Target columns, in row order
+            rows: Rows to load
+        """
+        buffer = io.StringIO("".join(_copy_line(row) for row in rows))
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+    def _insert_rows(self, cursor, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]):
+        """
+        Append rows to a table, using COPY for large batches.
+
+        Args:
+            cursor: Cursor inside the current transaction
+            table: Target table
+            columns: Target columns, in row order
+            rows: Rows to insert
+        """
+        if not rows:
+            return
+        if len(rows) >= DB_COPY_THRESHOLD:
+            self._copy_rows(cursor, table, columns, rows)
+        else:
+            pg_extras.execute_values(
+                cursor,
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s",
+                rows,
+                page_size=DB_COPY_THRESHOLD
+            )
+
+    def _write_cars(
+        self,
+        rows: List[ListingRow],
+        feature_rows: List[Tuple[str, str, str]],
+        price_rows: List[Tuple[str, int, Optional[str]]]
+    ) -> Set[str]:
+        # Lock rows in ID order so concurrent writers cannot deadlock
+        rows = sorted(rows, key=lambda row: row[0])
+        columns = ", ".join(LISTING_COLUMNS)
+        with self._transaction() as cursor:
+            if len(rows) >= DB_COPY_THRESHOLD:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {DB_TABLE_NAME}_staging "
+                    f"(LIKE {DB_TABLE_NAME} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                self._copy_rows(cursor, f"{DB_TABLE_NAME}_staging", LISTING_COLUMNS, rows)
+                cursor.execute(f"""
+                    INSERT INTO {DB_TABLE_NAME} ({columns}, last_seen)
+                    SELECT {columns}, CURRENT_TIMESTAMP FROM {DB_TABLE_NAME}_staging ORDER BY id
+                    {_UPSERT_CLAUSE}
+                    RETURNING id, xmax = 0
+                """)
+                written = cursor.fetchall()
+            else:
+                written = pg_extras.execute_values(
+                    cursor,
+                    f"INSERT INTO {DB_TABLE_NAME} ({columns}, last_seen) VALUES %s "
+                    f"{_UPSERT_CLAUSE} RETURNING id, xmax = 0",
+                    rows,
+                    template="(" + "%s, " * len(LISTING_COLUMNS) + "CURRENT_TIMESTAMP)",
+                    page_size=DB_COPY_THRESHOLD,
+                    fetch=True
+                )
+
+            # xmax is 0 only for rows this statement inserted rather than updated
+            written_ids = {car_id for car_id, _ in written}
+            existing = {car_id for car_id, inserted in written if not inserted}
+            # Rows missing from RETURNING already held this content
+            current_ids = [row[0] for row in rows if row[0] not in written_ids]
+            if current_ids:
+                existing.update(current_ids)
+                cursor.execute(
+                    f"UPDATE {DB_TABLE_NAME} SET last_seen = CURRENT_TIMESTAMP WHERE id = ANY(%s)",
+                    (current_ids,)
+                )
+
+            # Replace the features of every written listing
+            if written_ids:
+                cursor.execute(
+                    f"DELETE FROM {DB_FEATURES_TABLE_NAME} WHERE listing_id = ANY(%s)",
+                    (sorted(written_ids),)
+                )
+                self._insert_rows(
+                    cursor,
+                    DB_FEATURES_TABLE_NAME,
+                    ("listing_id", "name", "value"),
+                    [row for row in feature_rows if row[0] in written_ids]
+                )
+            self._append_price_changes(cursor, price_rows)
+        return existing
+
+    def _append_price_changes(self, cursor, price_rows: List[Tuple[str, int, Optional[str]]]):
+        """
+        Append the prices that differ from the latest recorded ones.
+
+        Runs after the listing rows were upserted, so their row locks make
+        concurrent writers of the same listing compare against each other's
+        committed history instead of both appending the same change.
+
+        Args:
+            cursor: Cursor inside the current transaction
+            price_rows: (listing_id, price_cents, currency) rows of the written listings
+        """
+        if not price_rows:
+            return
+        if len(price_rows) >= DB_COPY_THRESHOLD:
+            cursor.execute(
+                f"CREATE TEMP TABLE {DB_PRICE_HISTORY_TABLE_NAME}_staging "
+                "(listing_id TEXT, price_cents BIGINT, currency TEXT) ON COMMIT DROP"
+            )
+            self._copy_rows(
+                cursor, f"{DB_PRICE_HISTORY_TABLE_NAME}_staging", ("listing_id", "price_cents", "currency"), price_rows
+            )
+            cursor.execute(_PRICE_CHANGES_QUERY.format(source=f"{DB_PRICE_HISTORY_TABLE_NAME}_staging AS p"))
+        else:
+            pg_extras.execute_values(
+                cursor,
+                _PRICE_CHANGES_QUERY.format(source="(VALUES %s) AS p (listing_id, price_cents, currency)"),
+                price_rows,
+                template="(%s, %s::BIGINT, %s::TEXT)",
+                page_size=DB_COPY_THRESHOLD
+            )
+
+    def _touch_seen(self, car_ids: List[str]):
+        with self._transaction() as cursor:
+            cursor.execute(
+                f"UPDATE {DB_TABLE_NAME} SET last_seen = CURRENT_TIMESTAMP WHERE id = ANY(%s)",
+                (sorted(car_ids),)
+            )
+
+    def _fetch_all(self, query: str) -> List[Tuple[Any, ...]]:
+        with self._transaction() as cursor:
+            cursor.execute(query)
+            return cursor.fetchall()
+
+    def _delete_expired_chunk(self, days: int) -> List[str]:
+        with self._transaction() as cursor:
+            # Instances running retention at the same time take disjoint chunks
+            cursor.execute(f"""
+                SELECT id FROM {DB_TABLE_NAME}
+                WHERE last_seen < CURRENT_TIMESTAMP - %s::interval
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            """, (f"{days} days", RETENTION_BATCH_SIZE))
+            car_ids = [row[0] for row in cursor.fetchall()]
+            if not car_ids:
+                return car_ids
+
+            if RETENTION_ARCHIVE:
+                archive_rows = self._archive_records(self._fetch_records(cursor, car_ids))
+                if archive_rows:
+                    pg_extras.execute_values(
+                        cursor,
+                        f"INSERT INTO {DB_ARCHIVE_TABLE_NAME} (id, payload) VALUES %s",
+                        archive_rows
+                    )
+            cursor.execute(f"DELETE FROM {DB_TABLE_NAME} WHERE id = ANY(%s)", (car_ids,))
+        return car_ids
+
+    @staticmethod
+    def _fetch_records(cursor, car_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load full listings with their features for archiving.
+
+        Args:
+            cursor: Cursor inside the current transaction
+            car_ids: IDs of the listings to load
+
+        Returns:
+            Listing columns plus a ``features`` dict, keyed by ID
+        """
+        cursor.execute(f"SELECT * FROM {DB_TABLE_NAME} WHERE id = ANY(%s)", (car_ids,))
+        columns = [column[0] for column in cursor.description]
+        records = {}
+        for row in cursor.fetchall():
+            record = {
+                column: value.isoformat() if isinstance(value, datetime) else value
+                for column, value in zip(columns, row)
+            }
+            record['features'] = {}
+            records[record['id']] = record
+
+        cursor.execute(
+            f"SELECT listing_id, name, value FROM {DB_FEATURES_TABLE_NAME} WHERE listing_id = ANY(%s)",
+            (car_ids,)
+        )
+        for listing_id, name, value in cursor.fetchall():
+            records[listing_id]['features'][name] = value
+        return records
+
+    def get_price_drops(self, hours: int = 24, limit: int = 20) -> List[PriceDrop]:
+        try:
+            with self._transaction() as cursor:
+                cursor.execute(f"""
+                    WITH changed AS (
+                        SELECT DISTINCT listing_id FROM {DB_PRICE_HISTORY_TABLE_NAME}
+                        WHERE observed_at >= CURRENT_TIMESTAMP - %(window)s::interval
+                    ),
+                    baseline AS (
+                        SELECT listing_id, COALESCE(
+                            (SELECT price_cents FROM {DB_PRICE_HISTORY_TABLE_NAME} h
+                             WHERE h.listing_id = changed.listing_id
+                               AND h.observed_at < CURRENT_TIMESTAMP - %(window)s::interval
+                             ORDER BY h.observed_at DESC LIMIT 1),
+                            (SELECT price_cents FROM {DB_PRICE_HISTORY_TABLE_NAME} h
+                             WHERE h.listing_id = changed.listing_id
+                               AND h.observed_at >= CURRENT_TIMESTAMP - %(window)s::interval
+                             ORDER BY h.observed_at LIMIT 1)
+                        ) AS old_price_cents
+                        FROM changed
+                    )
+                    SELECT l.id, l.model_and_make, l.link, l.currency,
+                           b.old_price_cents, l.price_cents,
+                           b.old_price_cents - l.price_cents AS drop_cents
+                    FROM baseline b
+                    JOIN {DB_TABLE_NAME} l ON l.id = b.listing_id
+                    WHERE b.old_price_cents > l.price_cents
+                    ORDER BY drop_cents DESC
+                    LIMIT %(limit)s
+                """, {"window": f"{hours} hours", "limit": limit})
+                return [PriceDrop(*row) for row in cursor.fetchall()]
+        except psycopg2.Error as e:
+            logger.error(f"Database price drop query error: {e}")
+            return []
@@ -0,0 +1,165 @@
+"""
+Endpoint builder module.
+Composes lst.json endpoint URLs from search parameters and the site's
+Next.js build ID, so the browser is not needed to discover them.
+"""
+
+import random
+import re
+import threading
+import requests
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from src.config import (
+    USER_AGENTS,
+    SORT_OPTION,
+    REQUEST_TIMEOUT,
+    BUILD_ID_MAX_BYTES
+)
+from src.http_client import create_session
+from src.urls import set_query_params
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# The build ID appears in the static asset paths in <head> and in the
+# __NEXT_DATA__ script at the end of the page
+BUILD_ID_PATTERNS = (
+    re.compile(rb'/_next/static/([\w.-]+)/_buildManifest\.js'),
+    re.compile(rb'"buildId"\s*:\s*"([\w.-]+)"')
+)
+
+SORT_DIRECTIONS = {"ascending": "0", "descending": "1"}
+
+
+def sort_params(sort_option: str) -> Dict[str, str]:
+    """
+    Translate a sort dropdown value into lst.json query parameters.
+
+    Args:
+        sort_option: Dropdown value such as ``age-descending`` or ``standard``
+
+    Returns:
+        ``sort`` and ``desc`` query parameters
+    """
+    field, _, direction = sort_option.rpartition("-")
+    if field and direction in SORT_DIRECTIONS:
+        return {"sort": field, "desc": SORT_DIRECTIONS[direction]}
+    return {"sort": sort_option, "desc": "0"}
+
+
+class EndpointBuilder:
+    """
+    Builds lst.json URLs for search pages.
+
+    The Next.js build ID is read from one search page per host and cached
+    until a built endpoint stops working, which happens when the site is
+    redeployed.
+    """
+
+    def __init__(self):
+        self.session = create_session(1)
+        self._build_ids: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get_build_id(self, search_url: str) -> Optional[str]:
+        """
+        Get the build ID of the site serving a search page.
+
+        Args:
+            search_url: Search page URL
+
+        Returns:
+            Build ID, or None if it could not be found
+        """
+        host = urlsplit(search_url).netloc
+        with self._lock:
+            build_id = self._build_ids.get(host)
+        if build_id is not None:
+            return build_id
+
+        build_id = self._fetch_build_id(search_url)
+        if build_id is not None:
+            with self._lock:
+                self._build_ids[host] = build_id
+            logger.info(f"Found build ID {build_id} for {host}")
+        return build_id
+
+    def _fetch_build_id(self, search_url: str) -> Optional[str]:
+        """
+        Read the search page until the build ID shows up.
+
+        The page is streamed and the download stops as soon as a pattern
+        matches, usually within the first kilobytes.
+
+        Args:
+            search_url: Search page URL
+
+        Returns:
+            Build ID, or None if the page could not be read or has none
+        """
+        headers = {"User-Agent": random.choice(USER_AGENTS)}
+        try:
+            with self.session.get(search_url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                html = b""
+                received = 0
+                for chunk in response.iter_content(chunk_size=16384):
+                    # Keep a tail so a match split across chunks is still found
+                    html = html[-256:] + chunk
+                    for pattern in BUILD_ID_PATTERNS:
+                        match = pattern.search(html)
+                        if match:
+                            return match.group(1).decode("ascii")
+                    received += len(chunk)
+                    if received > BUILD_ID_MAX_BYTES:
+                        break
+        except requests.RequestException as e:
+            logger.warning(f"Could not load search page for build ID: {e}")
+            return None
+
+        logger.warning("No build ID found in search page")
+        return None
+
+    def invalidate(self, search_url: str):
+        """
+        Forget the cached build ID of a search page's host.
+
+        Args:
+            search_url: Search page URL
+        """
+        with self._lock:
+            if self._build_ids.pop(urlsplit(search_url).netloc, None) is not None:
+                logger.info("Cached build ID invalidated")
+
+    def build_endpoint(self, search_url: str, sort_option: str = SORT_OPTION, page: int = 1) -> Optional[str]:
+        """
+        Compose the lst.json URL for a search page.
+
+        Next.js serves the data of page ``/lst/...`` at
+        ``/_next/data/<build ID>/lst/....json``. The search page's query
+        parameters are kept and the sort order and page number are set,
+        matching what the site requests itself.
+
+        Args:
+            search_url: Search page URL
+            sort_option: Sort dropdown value
+            page: Page number
+
+        Returns:
+            lst.json URL, or None if the build ID is unknown
+        """
+        build_id = self.get_build_id(search_url)
+        if build_id is None:
+            return None
+
+        parts = urlsplit(search_url)
+        data_url = parts._replace(
+            path=f"/_next/data/{build_id}{parts.path.rstrip('/') or '/lst'}.json",
+            fragment=""
+        ).geturl()
+        return set_query_params(data_url, page=str(page), **sort_params(sort_option))
+
+
+# Global endpoint builder instance
+endpoint_builder = EndpointBuilder()
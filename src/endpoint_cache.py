@@ -0,0 +1,144 @@
+"""
+Endpoint cache module.
+Keeps discovered JSON endpoints across cycles so they are only
+rediscovered when the cached endpoint has expired or stopped working.
+"""
+
+import os
+import random
+import time
+import requests
+from typing import Dict, Optional
+from src.config import (
+    ENDPOINT_CACHE_FILE,
+    ENDPOINT_CACHE_TTL,
+    ENDPOINT_VALIDATION_TIMEOUT,
+    USER_AGENTS
+)
+from src.utils import setup_logger
+from src import json_codec
+
+logger = setup_logger(__name__)
+
+
+class EndpointCache:
+    """Caches JSON endpoints per search URL in memory and on disk."""
+
+    def __init__(self, cache_file: str = ENDPOINT_CACHE_FILE, ttl: int = ENDPOINT_CACHE_TTL):
+        """
+        Initialize endpoint cache.
+
+        Args:
+            cache_file: Path of the JSON file used to persist the cache
+            ttl: Time in seconds after which a cached endpoint is rediscovered
+        """
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self._entries: Dict[str, Dict] = self._load()
+
+    def get(self, search_url: str) -> Optional[str]:
+        """
+        Get a cached, still fresh endpoint for a search URL.
+
+        The endpoint is not requested here: the scrape's own first page
+        fetch shows whether it still works, and the caller invalidates it
+        when that fails.
+
+        Args:
+            search_url: Search page URL the endpoint was discovered from
+
+        Returns:
+            Cached JSON endpoint URL if fresh, None otherwise
+        """
+        entry = self._entries.get(search_url)
+        if entry is None:
+            return None
+
+        age = time.time() - entry['discovered_at']
+        if age > self.ttl:
+            logger.info(f"Cached JSON endpoint expired after {int(age)} seconds")
+            self.invalidate(search_url)
+            return None
+
+        logger.info("Using cached JSON endpoint")
+        return entry['url']
+
+    def set(self, search_url: str, endpoint_url: str):
+        """
+        Store a freshly discovered endpoint.
+
+        Args:
+            search_url: Search page URL the endpoint was discovered from
+            endpoint_url: Discovered JSON endpoint URL
+        """
+        self._entries[search_url] = {
+            'url': endpoint_url,
+            'discovered_at': time.time()
+        }
+        self._save()
+
+    def invalidate(self, search_url: str):
+        """
+        Drop the cached endpoint for a search URL.
+
+        Args:
+            search_url: Search page URL to invalidate
+        """
+        if self._entries.pop(search_url, None) is not None:
+            logger.info("Cached JSON endpoint invalidated")
+            self._save()
+
+    def validate(self, endpoint_url: str) -> bool:
+        """
+        Check that an endpoint still answers with the expected schema.
+
+        Args:
+            endpoint_url: JSON endpoint URL to check
+
+        Returns:
+            True if the endpoint returned a 2xx response with listings
+        """
+        try:
+            headers = {"User-Agent": random.choice(USER_AGENTS)}
+            response = requests.get(endpoint_url, headers=headers, timeout=ENDPOINT_VALIDATION_TIMEOUT)
+            response.raise_for_status()
+            listings = json_codec.loads(response.content).get('pageProps', {}).get('listings')
+        except (requests.RequestException, AttributeError) + json_codec.DECODE_ERRORS as e:
+            logger.warning(f"Cached JSON endpoint failed validation: {e}")
+            return False
+
+        if not isinstance(listings, list):
+            logger.warning("Cached JSON endpoint returned an unexpected schema")
+            return False
+        return True
+
+    def _load(self) -> Dict[str, Dict]:
+        """
+        Load persisted cache entries.
+
+        Returns:
+            Dictionary of cache entries keyed by search URL
+        """
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "rb") as f:
+                entries = json_codec.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError,) + json_codec.DECODE_ERRORS as e:
+            logger.warning(f"Could not load endpoint cache: {e}")
+            return {}
+
+    def _save(self):
+        """Persist cache entries atomically."""
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write(json_codec.dumps(self._entries))
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not save endpoint cache: {e}")
+
+
+# Global endpoint cache instance
+endpoint_cache = EndpointCache()
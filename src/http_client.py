@@ -0,0 +1,59 @@
+"""
+HTTP client helpers.
+Provides pooled keep-alive sessions and per-host rate limiting.
+"""
+
+import threading
+import time
+import requests
+from typing import Dict
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size: int) -> requests.Session:
+    """
+    Create a keep-alive session with a connection pool of the given size.
+
+    Args:
+        pool_size: Maximum number of connections kept open per host
+
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HostRateLimiter:
+    """Spaces out requests so no host receives more than a fixed rate."""
+
+    def __init__(self, requests_per_second: float):
+        """
+        Initialize rate limiter.
+
+        Args:
+            requests_per_second: Maximum request rate per host
+        """
+        self.min_interval = 1.0 / requests_per_second
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        """
+        Block until a request to the URL's host is allowed.
+
+        Args:
+            url: URL about to be requested
+        """
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,99 @@
+"""
+JSON codec module.
+Encodes and decodes JSON with the fastest available backend:
+orjson, then msgspec, then the standard library.
+"""
+
+import json
+from typing import Any, BinaryIO, Union
+from src.config import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+def _select_backend(preferred: str) -> str:
+    """
+    Pick the JSON backend to use.
+
+    Args:
+        preferred: Configured backend name or "auto"
+
+    Returns:
+        Name of an installed backend
+    """
+    available = {
+        "orjson": orjson is not None,
+        "msgspec": msgspec is not None,
+        "json": True
+    }
+    if preferred in available and available[preferred]:
+        return preferred
+    for name in ("orjson", "msgspec", "json"):
+        if available[name]:
+            return name
+    return "json"
+
+
+BACKEND = _select_backend(JSON_BACKEND)
+
+# Exceptions raised for malformed documents by any backend
+DECODE_ERRORS = (ValueError, msgspec.DecodeError) if msgspec is not None else (ValueError,)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode a JSON document.
+
+    Args:
+        data: JSON text or UTF-8 bytes
+
+    Returns:
+        Decoded Python object
+    """
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+    if BACKEND == "msgspec":
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def load(stream: BinaryIO) -> Any:
+    """
+    Decode a JSON document from a file-like object.
+
+    Args:
+        stream: File-like object with the JSON document
+
+    Returns:
+        Decoded Python object
+    """
+    return loads(stream.read())
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    """
+    Encode an object as compact JSON text.
+
+    All backends produce the same compact, non-ASCII-escaped output, so
+    the result can be hashed regardless of the backend in use.
+
+    Args:
+        obj: Object to encode
+        sort_keys: Whether to sort dictionary keys
+
+    Returns:
+        JSON text
+    """
+    if BACKEND == "orjson":
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode("utf-8")
+    if BACKEND == "msgspec":
+        return msgspec.json.encode(obj, order="sorted" if sort_keys else None).decode("utf-8")
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":"))
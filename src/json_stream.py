@@ -0,0 +1,85 @@
+"""
+Streaming JSON parsing module.
+Extracts listings and page metadata from lst.json responses without
+materializing the rest of the Next.js page payload.
+"""
+
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+from src import json_codec
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+# Paths of the listings array and its objects inside a lst.json response
+LISTINGS_ARRAY_PREFIX = "pageProps.listings"
+LISTINGS_PREFIX = "pageProps.listings.item"
+
+# Paths of the pagination metadata inside a lst.json response
+PAGE_PREFIX = "pageProps.pageQuery.page"
+NUMBER_OF_PAGES_PREFIX = "pageProps.numberOfPages"
+
+
+@dataclass
+class PageMetadata:
+    """Pagination fields of a lst.json response, filled in while streaming."""
+
+    page: Any = None
+    number_of_pages: Any = None
+    # False if the response has no listings array, i.e. an unexpected schema
+    has_listings: bool = False
+
+
+def _capture_metadata(events: Iterator, metadata: PageMetadata) -> Iterator:
+    """
+    Pass ijson parse events through, recording the pagination fields.
+
+    Args:
+        events: ijson parse events
+        metadata: Metadata to fill in
+
+    Returns:
+        The same events
+    """
+    for prefix, event, value in events:
+        if prefix == PAGE_PREFIX:
+            metadata.page = value
+        elif prefix == NUMBER_OF_PAGES_PREFIX:
+            metadata.number_of_pages = value
+        elif prefix == LISTINGS_ARRAY_PREFIX and event == "start_array":
+            metadata.has_listings = True
+        yield prefix, event, value
+
+
+def iter_listings(stream: BinaryIO, metadata: Optional[PageMetadata] = None) -> Iterator[Dict]:
+    """
+    Iterate over the listings of a lst.json response body.
+
+    With ijson installed, listings are yielded one by one as they are read
+    from the stream and everything else in the payload is skipped.
+    Without it, the body is parsed in full with :mod:`src.json_codec`.
+
+    Args:
+        stream: Binary file-like object with the response body
+        metadata: Filled with the page number, the page count and whether
+            the listings array is present; complete once the iterator is
+            exhausted
+
+    Returns:
+        Iterator over raw listing dictionaries
+    """
+    if ijson is None:
+        page_props = json_codec.load(stream).get('pageProps', {})
+        listings = page_props.get('listings')
+        if metadata is not None:
+            metadata.page = page_props.get('pageQuery', {}).get('page')
+            metadata.number_of_pages = page_props.get('numberOfPages')
+            metadata.has_listings = isinstance(listings, list)
+        yield from listings if isinstance(listings, list) else []
+    elif metadata is None:
+        yield from ijson.items(stream, LISTINGS_PREFIX, use_float=True)
+    else:
+        events = _capture_metadata(ijson.parse(stream, use_float=True), metadata)
+        yield from ijson.items(events, LISTINGS_PREFIX)
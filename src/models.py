@@ -0,0 +1,81 @@
+"""
+Data models for car listings.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional
+
+
+class FuelType(str, Enum):
+    """Normalized fuel type."""
+
+    PETROL = "petrol"
+    DIESEL = "diesel"
+    ELECTRIC = "electric"
+    HYBRID_PETROL = "hybrid_petrol"
+    HYBRID_DIESEL = "hybrid_diesel"
+    LPG = "lpg"
+    CNG = "cng"
+    HYDROGEN = "hydrogen"
+    ETHANOL = "ethanol"
+    OTHER = "other"
+
+
+class Transmission(str, Enum):
+    """Normalized transmission type."""
+
+    MANUAL = "manual"
+    AUTOMATIC = "automatic"
+    SEMI_AUTOMATIC = "semi_automatic"
+    UNKNOWN = "unknown"
+
+
+@dataclass
+class CarListing:
+    """A single car listing as stored and notified."""
+
+    __slots__ = (
+        "id",
+        "make",
+        "model",
+        "model_version",
+        "price_text",
+        "price_cents",
+        "currency",
+        "mileage_km",
+        "registration_year",
+        "registration_month",
+        "power_kw",
+        "fuel",
+        "transmission",
+        "transmission_type",
+        "link",
+        "image",
+        "company",
+        "features"
+    )
+
+    id: str
+    make: str
+    model: str
+    model_version: str
+    price_text: str  # price as displayed, e.g. "€ 12.990,-"
+    price_cents: Optional[int]
+    currency: Optional[str]  # ISO 4217 code
+    mileage_km: Optional[int]
+    registration_year: Optional[int]
+    registration_month: Optional[int]
+    power_kw: Optional[int]
+    fuel: Optional[FuelType]
+    transmission: str  # transmission as displayed
+    transmission_type: Transmission
+    link: str
+    image: str
+    company: str
+    features: Dict[str, str]
+
+    @property
+    def model_and_make(self) -> str:
+        """Make, model and version as a single display string."""
+        return f"{self.make} {self.model} {self.model_version}".strip()
@@ -3,79 +3,451 @@ Telegram notification module.
 Handles sending error notifications to Telegram.
 """
 
+import queue
+import re
+import threading
+import time
 import requests
-from typing import Optional
-from src.config import TELEGRAM_API_KEY, TELEGRAM_CHAT_ID, TELEGRAM_ENABLED
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from src.config import (
+    TELEGRAM_API_KEY,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_ENABLED,
+    TELEGRAM_QUEUE_SIZE,
+    TELEGRAM_BATCH_WINDOW,
+    TELEGRAM_MAX_MESSAGE_LENGTH,
+    TELEGRAM_CHAT_INTERVAL,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_MAX_RETRIES,
+    TELEGRAM_RETRY_BACKOFF,
+    TELEGRAM_SHUTDOWN_TIMEOUT,
+    ERROR_DEDUP_WINDOW,
+    ERROR_ALERTS_PER_MINUTE,
+    ERROR_ALERT_BURST
+)
 from src.utils import setup_logger
+from src.http_client import create_session
 
 logger = setup_logger(__name__)
 
+# Messages are sent by a single background thread, so one pooled connection suffices
+SENDER_THREADS = 1
+
+# Kinds of queued messages; consecutive messages of one kind are batched
+KIND_INFO = "info"
+KIND_ERROR = "error"
+KIND_NEW_CAR = "new_car"
+
+
+# Variable parts of error messages, replaced when computing signatures
+_URL_PATTERN = re.compile(r"https?://\S+")
+_HEX_PATTERN = re.compile(r"\b(?=[0-9a-f-]*\d)[0-9a-f][0-9a-f-]{7,}\b", re.IGNORECASE)
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class TokenBucket:
+    """Token bucket limiting how many events may happen per minute."""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate_per_minute: Tokens added per minute
+            burst: Maximum number of stored tokens
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def consume(self) -> bool:
+        """
+        Take one token if available.
+
+        Returns:
+            True if a token was taken, False if the limit is reached
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+class ErrorAggregator:
+    """
+    Deduplicates error alerts by normalized signature.
+
+    The first occurrence of an error is sent right away. Further
+    occurrences within ``window`` seconds are only counted, and a summary
+    such as "x17 in last 10 min" is sent when the window ends. All
+    outgoing alerts are limited by a token bucket.
+    """
+
+    def __init__(self, window: float = ERROR_DEDUP_WINDOW, bucket: Optional[TokenBucket] = None):
+        """
+        Initialize error aggregator.
+
+        Args:
+            window: Seconds during which identical errors are aggregated
+            bucket: Rate limit for outgoing alerts
+        """
+        self.window = window
+        self.bucket = bucket or TokenBucket(ERROR_ALERTS_PER_MINUTE, ERROR_ALERT_BURST)
+        # signature -> [window start, occurrences, suppressed occurrences, latest message]
+        self._entries: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(message: str) -> str:
+        """
+        Normalize an error message so repeated errors share one signature.
+
+        Args:
+            message: Error message
+
+        Returns:
+            Message with URLs, IDs and numbers replaced by placeholders
+        """
+        signature = _URL_PATTERN.sub("<url>", message)
+        signature = _HEX_PATTERN.sub("<id>", signature)
+        signature = _NUMBER_PATTERN.sub("<n>", signature)
+        return _WHITESPACE_PATTERN.sub(" ", signature).strip().lower()
+
+    def _window_label(self) -> str:
+        minutes = self.window / 60
+        return f"{minutes:g} min" if minutes >= 1 else f"{self.window:g} s"
+
+    def submit(self, message: str) -> Optional[str]:
+        """
+        Record an error and decide whether to alert now.
+
+        Args:
+            message: Error message
+
+        Returns:
+            Alert text to send now, or None if it is suppressed
+        """
+        key = self.signature(message)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                entry[2] += 1
+                entry[3] = message
+                return None
+
+            text = message
+            if entry is not None and entry[2]:
+                # Fold the summary of the expired window into this alert
+                text = f"{message}\n\n<i>x{entry[1]} in previous {self._window_label()}</i>"
+
+            if not self.bucket.consume():
+                self._entries[key] = [now, 1, 1, message]
+                return None
+
+            self._entries[key] = [now, 1, 0, message]
+            return text
+
+    def flush_expired(self) -> List[str]:
+        """
+        Collect summaries for windows that ended with suppressed errors.
+
+        Returns:
+            Summary alert texts to send
+        """
+        summaries = []
+        now = time.monotonic()
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if now - entry[0] < self.window:
+                    continue
+                if entry[2] and not self.bucket.consume():
+                    # Out of tokens; try again on the next flush
+                    continue
+                if entry[2]:
+                    summaries.append(f"{entry[3]}\n\n<i>x{entry[1]} in last {self._window_label()}</i>")
+                del self._entries[key]
+
+        return summaries
+
 
 class TelegramNotifier:
-    """Handles Telegram notifications."""
+    """
+    Handles Telegram notifications.
+
+    Messages are queued and sent by a background thread, so callers never
+    wait on Telegram. The sender batches queued messages of the same kind
+    into one Telegram message, respects per-chat and global rate limits,
+    retries failed sends with backoff and drains the queue on :meth:`close`.
+    """
 
     def __init__(self):
         self.api_key = TELEGRAM_API_KEY
         self.chat_id = TELEGRAM_CHAT_ID
         self.enabled = TELEGRAM_ENABLED
+        self.api_url = f"https://api.telegram.org/bot{self.api_key}/sendMessage"
+        # Keep-alive session so bursts of messages reuse one TLS connection
+        self.session = create_session(SENDER_THREADS)
+
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=TELEGRAM_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._last_chat_send = 0.0
+        self._recent_sends: Deque[float] = deque()
+        self.error_aggregator = ErrorAggregator()
 
         if not self.enabled:
             logger.warning("Telegram notifications are disabled. Set TELEGRAM_API_KEY and TELEGRAM_CHAT_ID in .env")
 
-    def send_message(self, message: str) -> bool:
+    def _ensure_worker(self):
+        """Start the background sender thread if it is not running."""
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run_worker, name="telegram-sender", daemon=True)
+                self._worker.start()
+
+    def _enqueue(self, kind: str, message: str) -> bool:
         """
-        Send a message to Telegram.
+        Queue a message for the background sender.
 
         Args:
+            kind: Message kind used for batching
             message: Message text to send
 
         Returns:
-            True if successful, False otherwise
+            True if queued, False if disabled or the queue is full
         """
         if not self.enabled:
             logger.debug(f"Telegram disabled. Would have sent: {message}")
             return False
 
+        self._ensure_worker()
         try:
-            url = f"https://api.telegram.org/bot{self.api_key}/sendMessage"
-            payload = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": "HTML"
-            }
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-            logger.debug("Telegram notification sent successfully")
+            self._queue.put_nowait((kind, message))
             return True
-        except requests.RequestException as e:
-            logger.error(f"Failed to send Telegram notification: {e}")
+        except queue.Full:
+            logger.warning("Telegram queue is full, dropping notification")
+            return False
+
+    def _run_worker(self):
+        """Send queued messages in batches until the stop sentinel arrives."""
+        pending: Deque[Tuple[str, str]] = deque()
+        stopping = False
+
+        while True:
+            if not pending:
+                if stopping:
+                    break
+                item = self._queue.get()
+                if item is None:
+                    break
+                pending.append(item)
+
+            kind, first = pending.popleft()
+            batch = [first]
+            length = len(first)
+
+            # Collect more messages of the same kind arriving within the window
+            deadline = time.monotonic() + TELEGRAM_BATCH_WINDOW
+            while True:
+                if pending:
+                    item = pending.popleft()
+                elif stopping:
+                    break
+                else:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                if item[0] != kind or length + len(item[1]) + 2 > TELEGRAM_MAX_MESSAGE_LENGTH:
+                    pending.appendleft(item)
+                    break
+                batch.append(item[1])
+                length += len(item[1]) + 2
+
+            self.send_message(self._format_batch(kind, batch))
+
+    @staticmethod
+    def _format_batch(kind: str, messages: List[str]) -> str:
+        """
+        Combine a batch of messages into one Telegram message.
+
+        Args:
+            kind: Kind shared by all messages in the batch
+            messages: Message texts
+
+        Returns:
+            Combined message text
+        """
+        if kind == KIND_NEW_CAR:
+            title = "New car listing found!" if len(messages) == 1 else f"{len(messages)} new car listings found!"
+            return f"ℹ️ <b>Info</b>\n\n{title}\n\n" + "\n\n".join(messages)
+        return "\n\n".join(messages)
+
+    def _wait_for_rate_limit(self):
+        """Sleep until both the per-chat and global send limits allow a message."""
+        now = time.monotonic()
+        delay = self._last_chat_send + TELEGRAM_CHAT_INTERVAL - now
+
+        while self._recent_sends and self._recent_sends[0] <= now - 1.0:
+            self._recent_sends.popleft()
+        if len(self._recent_sends) >= TELEGRAM_GLOBAL_RATE:
+            delay = max(delay, self._recent_sends[0] + 1.0 - now)
+
+        if delay > 0:
+            time.sleep(delay)
+
+        sent_at = time.monotonic()
+        self._last_chat_send = sent_at
+        self._recent_sends.append(sent_at)
+
+    def send_message(self, message: str) -> bool:
+        """
+        Send a message to Telegram right away, retrying with backoff.
+
+        Args:
+            message: Message text to send
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled:
+            logger.debug(f"Telegram disabled. Would have sent: {message}")
             return False
 
+        payload = {
+            "chat_id": self.chat_id,
+            "text": message,
+            "parse_mode": "HTML"
+        }
+        backoff = TELEGRAM_RETRY_BACKOFF
+
+        for attempt in range(1, TELEGRAM_MAX_RETRIES + 1):
+            self._wait_for_rate_limit()
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=10)
+                if response.status_code == 429:
+                    # Telegram tells us how long to back off
+                    retry_after = response.json().get("parameters", {}).get("retry_after", backoff)
+                    logger.warning(f"Telegram rate limit hit, retrying in {retry_after} seconds")
+                    time.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+                logger.debug("Telegram notification sent successfully")
+                return True
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                if status is not None and 400 <= status < 500:
+                    # Client errors will not succeed on retry
+                    logger.error(f"Failed to send Telegram notification: {e}")
+                    return False
+                logger.warning(f"Telegram send attempt {attempt} failed: {e}")
+                if attempt < TELEGRAM_MAX_RETRIES:
+                    time.sleep(backoff)
+                    backoff *= 2
+
+        logger.error(f"Failed to send Telegram notification after {TELEGRAM_MAX_RETRIES} attempts")
+        return False
+
     def send_error(self, error_message: str) -> bool:
         """
-        Send an error notification to Telegram.
+        Queue an error notification to Telegram.
+
+        Repeated errors are aggregated and alerts are rate limited,
+        see :class:`ErrorAggregator`.
 
         Args:
             error_message: Error message to send
 
         Returns:
-            True if successful, False otherwise
+            True if queued, False if suppressed or not queued
         """
-        formatted_message = f"🚨 <b>Error Alert</b>\n\n{error_message}"
-        return self.send_message(formatted_message)
+        if not self.enabled:
+            logger.debug(f"Telegram disabled. Would have sent: {error_message}")
+            return False
+
+        alert = self.error_aggregator.submit(error_message)
+        if alert is None:
+            logger.debug("Duplicate or rate limited error alert suppressed")
+            return False
+        return self._enqueue(KIND_ERROR, f"🚨 <b>Error Alert</b>\n\n{alert}")
+
+    def flush_error_summaries(self) -> int:
+        """
+        Queue summaries of errors suppressed during windows that have ended.
+
+        Returns:
+            Number of summaries queued
+        """
+        if not self.enabled:
+            return 0
+
+        queued = 0
+        for summary in self.error_aggregator.flush_expired():
+            if self._enqueue(KIND_ERROR, f"🚨 <b>Error Alert</b>\n\n{summary}"):
+                queued += 1
+        return queued
 
     def send_info(self, info_message: str) -> bool:
         """
-        Send an info notification to Telegram.
+        Queue an info notification to Telegram.
 
         Args:
             info_message: Info message to send
 
         Returns:
-            True if successful, False otherwise
+            True if queued, False otherwise
         """
         formatted_message = f"ℹ️ <b>Info</b>\n\n{info_message}"
-        return self.send_message(formatted_message)
+        return self._enqueue(KIND_INFO, formatted_message)
+
+    def send_new_car(self, car_message: str) -> bool:
+        """
+        Queue a new listing notification; close together ones are batched.
+
+        Args:
+            car_message: Description of the new listing
+
+        Returns:
+            True if queued, False otherwise
+        """
+        return self._enqueue(KIND_NEW_CAR, car_message)
+
+    def close(self, timeout: float = TELEGRAM_SHUTDOWN_TIMEOUT):
+        """
+        Drain queued messages and stop the background sender.
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain
+        """
+        with self._worker_lock:
+            worker = self._worker
+            self._worker = None
+        if worker is None or not worker.is_alive():
+            return
+
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Telegram queue did not drain before shutdown")
+            return
+        worker.join(timeout)
+        if worker.is_alive():
+            logger.warning("Telegram sender did not finish before shutdown")
+        else:
+            self.session.close()
 
 
 # Global notifier instance
@@ -0,0 +1,125 @@
+"""
+Page cache module.
+Remembers the HTTP validators and contents of fetched lst.json pages so
+unchanged pages are neither downloaded again nor stored again.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, NamedTuple, Optional, Tuple
+from src.config import PAGE_CACHE_SIZE
+
+
+class CachedPage(NamedTuple):
+    """What is known about the last successful fetch of a page URL."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_hash: str
+    listing_ids: Tuple[str, ...]
+    number_of_pages: Optional[int]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Build the headers of a conditional request for this page.
+
+        Returns:
+            If-None-Match / If-Modified-Since headers for the known validators
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HashingReader:
+    """Binary stream wrapper that hashes the bytes read through it."""
+
+    def __init__(self, stream: BinaryIO):
+        """
+        Initialize hashing reader.
+
+        Args:
+            stream: Binary file-like object, e.g. a streamed response body
+        """
+        self._stream = stream
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read from the wrapped stream and add the bytes to the hash.
+
+        Args:
+            size: Maximum number of bytes to read, -1 for all
+
+        Returns:
+            Bytes read
+        """
+        data = self._stream.read(size)
+        self._hash.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        """
+        Hash the whole stream, reading whatever the consumer left unread.
+
+        Returns:
+            Hex digest of the stream contents
+        """
+        while self.read(65536):
+            pass
+        return self._hash.hexdigest()
+
+
+class PageCache:
+    """Keeps the most recently fetched pages, keyed by page URL."""
+
+    def __init__(self, max_entries: int = PAGE_CACHE_SIZE):
+        """
+        Initialize page cache.
+
+        Args:
+            max_entries: Number of page URLs remembered; the least recently
+                used entries are dropped first
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """
+        Get the cached state of a page URL.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Cached page, or None if the URL was not fetched yet
+        """
+        with self._lock:
+            page = self._entries.get(url)
+            if page is not None:
+                self._entries.move_to_end(url)
+            return page
+
+    def set(self, url: str, page: CachedPage):
+        """
+        Remember the state of a freshly fetched page.
+
+        Args:
+            url: Page URL
+            page: Validators and contents of the page
+        """
+        with self._lock:
+            self._entries[url] = page
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget all cached pages."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,159 @@
+"""
+Adaptive scheduling module.
+Decides how long to wait between scraping cycles.
+"""
+
+import time
+from typing import List, Optional
+from src.config import (
+    SCRAPE_INTERVAL,
+    ADAPTIVE_SCHEDULING,
+    MIN_SCRAPE_INTERVAL,
+    MAX_SCRAPE_INTERVAL,
+    TARGET_NEW_LISTINGS_PER_CYCLE,
+    ARRIVAL_RATE_SMOOTHING,
+    MAX_INTERVAL_GROWTH
+)
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AdaptiveScheduler:
+    """
+    Chooses the interval between cycles from observed listing arrival rates.
+
+    The arrival rate of new listings is tracked per hour of day as an
+    exponentially weighted average. The interval is sized so that a cycle
+    finds about ``target_new`` listings: it shrinks as soon as listings flow
+    and grows by at most ``max_growth`` per cycle while the site is quiet,
+    so a single empty cycle does not stall polling at peak times. Failed
+    cycles back off exponentially and honor any Retry-After delay.
+    Intervals are measured between cycle starts, so the time spent
+    scraping is subtracted from the wait.
+    """
+
+    def __init__(
+        self,
+        base_interval: float = SCRAPE_INTERVAL,
+        min_interval: float = MIN_SCRAPE_INTERVAL,
+        max_interval: float = MAX_SCRAPE_INTERVAL,
+        target_new: float = TARGET_NEW_LISTINGS_PER_CYCLE,
+        smoothing: float = ARRIVAL_RATE_SMOOTHING,
+        max_growth: float = MAX_INTERVAL_GROWTH,
+        enabled: bool = ADAPTIVE_SCHEDULING
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            base_interval: Interval used before any rate is known
+            min_interval: Shortest allowed interval in seconds
+            max_interval: Longest allowed interval in seconds
+            target_new: New listings a cycle should find on average
+            smoothing: Weight of the latest observation in the moving average
+            max_growth: Factor the interval may grow by from one cycle to the next
+            enabled: If False, always use the base interval
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self.smoothing = smoothing
+        self.max_growth = max_growth
+        self.enabled = enabled
+        # New listings per second for each hour of the day
+        self._hourly_rate: List[Optional[float]] = [None] * 24
+        self._last_cycle_start: Optional[float] = None
+        self._consecutive_errors = 0
+        # Interval chosen after the last cycle, the base for gradual growth
+        self._interval = base_interval
+
+    def _clamp(self, interval: float) -> float:
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _update_rate(self, started_at: float, new_listings: int):
+        """
+        Fold a successful cycle into the arrival rate of its hour.
+
+        Args:
+            started_at: Wall clock time the cycle started
+            new_listings: Number of new listings the cycle found
+        """
+        if self._last_cycle_start is None:
+            return
+        elapsed = started_at - self._last_cycle_start
+        if elapsed <= 0:
+            return
+
+        hour = time.localtime(started_at).tm_hour
+        observed = new_listings / elapsed
+        previous = self._hourly_rate[hour]
+        if previous is None:
+            self._hourly_rate[hour] = observed
+        else:
+            self._hourly_rate[hour] = self.smoothing * observed + (1 - self.smoothing) * previous
+
+    def next_interval(self, started_at: float) -> float:
+        """
+        Compute the interval for the hour of the given time.
+
+        The interval sized from the arrival rate is applied at once when it
+        is shorter than the current one; a longer one is approached by
+        growing the current interval by at most ``max_growth``.
+
+        Args:
+            started_at: Wall clock time of the cycle
+
+        Returns:
+            Interval between cycle starts in seconds
+        """
+        rate = self._hourly_rate[time.localtime(started_at).tm_hour]
+        if rate is None:
+            return self._clamp(self.base_interval)
+        target = self.target_new / rate if rate > 0 else self.max_interval
+        return self._clamp(min(target, self._interval * self.max_growth))
+
+    def record_cycle(
+        self,
+        started_at: float,
+        duration: float,
+        new_listings: Optional[int],
+        retry_after: Optional[float] = None
+    ) -> float:
+        """
+        Record a finished cycle and compute how long to wait before the next.
+
+        Args:
+            started_at: Wall clock time the cycle started
+            duration: Time the cycle took in seconds
+            new_listings: Number of new listings found, or None if the cycle failed
+            retry_after: Delay requested by the server (e.g. on HTTP 429)
+
+        Returns:
+            Seconds to sleep before starting the next cycle
+        """
+        if not self.enabled:
+            interval = self.base_interval
+        elif new_listings is None:
+            self._consecutive_errors += 1
+            # The exponent is capped so long outages cannot overflow the float
+            interval = min(
+                self.max_interval,
+                self.base_interval * 2 ** min(self._consecutive_errors, 32)
+            )
+            logger.info(f"Cycle failed {self._consecutive_errors} time(s) in a row, backing off")
+        else:
+            self._consecutive_errors = 0
+            self._update_rate(started_at, new_listings)
+            interval = self.next_interval(started_at)
+            # Failed cycles found nothing, so rates are measured between
+            # successful cycles, whose listings span the whole gap
+            self._last_cycle_start = started_at
+        self._interval = interval
+
+        if retry_after:
+            interval = max(interval, retry_after)
+
+        return max(0.0, interval - duration)
+
@@ -5,26 +5,75 @@ Handles fetching and processing car listings from AutoScout24.
 
 import requests
 import random
-from typing import Optional, List, Dict
-from src.config import USER_AGENTS, PAGES_TO_SCRAPE, BOT_NAME
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, FrozenSet, NamedTuple, Tuple
+from src.config import (
+    USER_AGENTS,
+    PAGES_TO_SCRAPE,
+    BOT_NAME,
+    SCRAPE_CONCURRENCY,
+    SCRAPE_MODE,
+    INCREMENTAL_OVERLAP_PAGES,
+    REQUESTS_PER_SECOND_PER_HOST,
+    REQUEST_TIMEOUT
+)
+from src.http_client import create_session, HostRateLimiter
+from src.json_stream import PageMetadata, iter_listings
+from src.page_cache import CachedPage, HashingReader, PageCache
+from src.urls import parse_page_number, with_page
 from src.utils import (
     setup_logger,
     format_price,
     extract_vehicle_features,
-    build_car_url
+    build_car_url,
+    normalize_price,
+    normalize_amount,
+    normalize_mileage,
+    normalize_power_kw,
+    normalize_registration,
+    normalize_fuel,
+    normalize_transmission
 )
+from src.models import CarListing
 from src.database import db_manager
 from src.notifier import notifier
 
 logger = setup_logger(__name__)
 
 
+class PageResult(NamedTuple):
+    """Listings of a fetched page and the pagination reported with them."""
+
+    page: int
+    cars: List[CarListing]
+    number_of_pages: Optional[int]
+    # False when the response was for another page than the requested one
+    valid: bool
+    listing_ids: Tuple[str, ...] = ()
+    # True when the page is unchanged since the last fetch; cars is then empty
+    unchanged: bool = False
+    url: Optional[str] = None
+    # Page cache entry to remember once the page has been stored
+    cache_entry: Optional[CachedPage] = None
+
+
 class AutoScoutScraper:
     """Main scraper class for AutoScout24 listings."""
 
     def __init__(self):
         self.user_agents = USER_AGENTS
         self.pages_to_scrape = PAGES_TO_SCRAPE
+        self.concurrency = SCRAPE_CONCURRENCY
+        self.mode = SCRAPE_MODE
+        self.overlap_pages = INCREMENTAL_OVERLAP_PAGES
+        self.session = create_session(SCRAPE_CONCURRENCY)
+        self.rate_limiter = HostRateLimiter(REQUESTS_PER_SECOND_PER_HOST)
+        self.page_cache = PageCache()
+        # Outcome of the last scrape_listings() call, read by the scheduler
+        self.last_scrape_failed = False
+        self.last_retry_after: Optional[float] = None
+        # True when the endpoint itself looks broken (error status or schema)
+        self.last_endpoint_failed = False
 
     def _get_random_headers(self) -> Dict[str, str]:
         """
@@ -37,7 +86,27 @@ class AutoScoutScraper:
             "User-Agent": random.choice(self.user_agents)
         }
 
-    def _parse_listing(self, listing: Dict) -> Dict:
+    @staticmethod
+    def _get_retry_after(error: requests.RequestException) -> Optional[float]:
+        """
+        Extract the server-requested delay from a throttled response.
+
+        Args:
+            error: Request exception raised while fetching
+
+        Returns:
+            Delay in seconds for HTTP 429/503 responses, None otherwise
+        """
+        response = error.response
+        if response is None or response.status_code not in (429, 503):
+            return None
+        try:
+            return float(response.headers.get("Retry-After", 0)) or None
+        except ValueError:
+            # HTTP-date form is not worth parsing; let the scheduler back off
+            return None
+
+    def _parse_listing(self, listing: Dict) -> CarListing:
         """
         Parse a single listing into structured car information.
 
@@ -45,16 +114,11 @@ class AutoScoutScraper:
             listing: Raw listing data from API
 
         Returns:
-            Structured car information dictionary
+            Structured car listing
         """
         car_id = listing['id']
         vehicle = listing.get('vehicle', {})
-
-        # Extract basic info
-        make = vehicle.get('make', 'Unknown make')
-        model = vehicle.get('model', 'Unknown model')
-        model_version = vehicle.get('modelVersionInput', '')
-        model_and_brand = f"{make} {model} {model_version}".strip()
+        tracking = listing.get('tracking', {})
 
         # Extract price
         price_text = format_price(listing.get('price'))
@@ -63,79 +127,336 @@ class AutoScoutScraper:
         images = listing.get('images', [])
         img_src = images[0] if images else 'Image not available'
 
-        # Build car URL
-        car_link = build_car_url(listing.get('url', ''))
-
         # Extract features
         vehicle_details = listing.get('vehicleDetails', [])
         features = extract_vehicle_features(vehicle_details)
 
-        return {
-            'ID': car_id,
-            'Image': img_src,
-            'Model and Make': model_and_brand,
-            'Link': car_link,
-            'Price': price_text,
-            'Company': 'autoscout24',
-            'Features': features,
-            'Transmission': features.get('transmission', 'Unknown')
-        }
+        # Normalize numeric values. The price comes from the plain tracking
+        # amount when present, the display string only adds the currency;
+        # other values prefer the display strings over the tracking data
+        price_cents, currency = normalize_price(price_text)
+        tracking_price_cents = normalize_amount(tracking.get('price'))
+        if tracking_price_cents is not None:
+            price_cents = tracking_price_cents
+        registration_year, registration_month = normalize_registration(
+            features.get('calendar') or tracking.get('firstRegistration')
+        )
+        transmission = features.get('transmission', 'Unknown')
+
+        return CarListing(
+            id=car_id,
+            make=vehicle.get('make', 'Unknown make'),
+            model=vehicle.get('model', 'Unknown model'),
+            model_version=vehicle.get('modelVersionInput', ''),
+            price_text=price_text,
+            price_cents=price_cents,
+            currency=currency,
+            mileage_km=normalize_mileage(features.get('mileage_road') or tracking.get('mileage')),
+            registration_year=registration_year,
+            registration_month=registration_month,
+            power_kw=normalize_power_kw(features.get('speedometer')),
+            fuel=normalize_fuel(features.get('gas_pump') or vehicle.get('fuel') or tracking.get('fuelType')),
+            transmission=transmission,
+            transmission_type=normalize_transmission(transmission),
+            link=build_car_url(listing.get('url', '')),
+            image=img_src,
+            company='autoscout24',
+            features=features
+        )
 
-    def scrape_listings(self, json_url: str) -> int:
+    def _fetch_page(self, json_url: str, page_num: int) -> PageResult:
         """
-        Scrape car listings from the JSON endpoint.
+        Fetch a single page and parse its listings while streaming.
+
+        Pages fetched before are requested conditionally. If the server
+        answers 304 Not Modified, or the body hashes to the same value as
+        last time, the parsed listings are dropped and the cached listing
+        IDs are returned instead, so the page is not stored again. The page
+        cache is only updated by :meth:`_store_page` once the page has been
+        stored.
+
+        Args:
+            json_url: JSON endpoint URL
+            page_num: Page number to fetch
+
+        Returns:
+            Page result with the structured car listings
+        """
+        paged_url = with_page(json_url, page_num)
+        cached = self.page_cache.get(paged_url)
+
+        # Make request over the shared keep-alive session
+        self.rate_limiter.wait(paged_url)
+        headers = self._get_random_headers()
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+        with self.session.get(paged_url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            if response.status_code == 304 and cached is not None:
+                logger.info(f"Page {page_num} not modified since the last fetch")
+                return self._unchanged_result(paged_url, page_num, cached)
+            response.raise_for_status()
+            response.raw.decode_content = True
+
+            # Parse each listing as it arrives, hashing the body on the way
+            body = HashingReader(response.raw)
+            metadata = PageMetadata()
+            cars = []
+            for listing in iter_listings(body, metadata):
+                try:
+                    cars.append(self._parse_listing(listing))
+                except Exception as e:
+                    logger.error(f"Error parsing listing: {e}")
+                    continue
+            body_hash = body.hexdigest()
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if cached is not None and cached.body_hash == body_hash:
+            logger.info(f"Page {page_num} unchanged since the last fetch")
+            return self._unchanged_result(
+                paged_url, page_num, cached._replace(etag=etag, last_modified=last_modified)
+            )
+        if not metadata.has_listings:
+            raise KeyError("pageProps.listings")
+
+        number_of_pages = parse_page_number(metadata.number_of_pages)
+        returned_page = parse_page_number(metadata.page)
+        if returned_page is not None and returned_page != page_num:
+            # The site answers out-of-range pages with another page
+            logger.warning(f"Requested page {page_num} but received page {returned_page}, ignoring it")
+            return PageResult(page_num, [], number_of_pages, False)
+
+        listing_ids = tuple(car.id for car in cars)
+        logger.info(f"Found {len(cars)} listings on page {page_num} of {number_of_pages or 'unknown'}")
+        return PageResult(
+            page_num, cars, number_of_pages, True, listing_ids,
+            url=paged_url,
+            cache_entry=CachedPage(etag, last_modified, body_hash, listing_ids, number_of_pages)
+        )
+
+    @staticmethod
+    def _unchanged_result(url: str, page_num: int, cached: CachedPage) -> PageResult:
+        """
+        Build the result of a page whose content did not change.
+
+        Args:
+            url: Page URL
+            page_num: Page number
+            cached: Cached state of the page, with the latest validators
+
+        Returns:
+            Page result carrying the cached listing IDs and page count
+        """
+        return PageResult(
+            page_num, [], cached.number_of_pages, True, cached.listing_ids,
+            unchanged=True, url=url, cache_entry=cached
+        )
+
+    @staticmethod
+    def _is_duplicate_page(result: PageResult, seen_pages: Dict[FrozenSet[str], int]) -> bool:
+        """
+        Check whether a page repeats the listings of a page fetched earlier.
+
+        Args:
+            result: Fetched page
+            seen_pages: Listing ID sets of the pages fetched this cycle,
+                mapped to their page number; updated in place
+
+        Returns:
+            True if another page had exactly the same listings
+        """
+        listing_ids = frozenset(result.listing_ids)
+        if not listing_ids:
+            return False
+        first_page = seen_pages.setdefault(listing_ids, result.page)
+        if first_page != result.page:
+            logger.warning(f"Page {result.page} repeats the listings of page {first_page}, ignoring it")
+            return True
+        return False
+
+    def _store_page(self, page: PageResult) -> int:
+        """
+        Store the listings of a page in one transaction.
+
+        Listings of an unchanged page were stored when the page last
+        changed, so they are only marked as seen. The page is remembered
+        in the page cache only after it was stored; if the write fails the
+        cycle is marked as failed and the page is fetched in full next time.
+
+        Args:
+            page: Fetched page
+
+        Returns:
+            Number of new cars stored
+        """
+        new_car_count = 0
+        if page.unchanged:
+            db_manager.mark_seen(page.listing_ids)
+        else:
+            result = db_manager.upsert_cars(page.cars)
+            if result.failed:
+                self.last_scrape_failed = True
+                return 0
+            new_car_count = len(result.new_ids)
+        if page.cache_entry is not None:
+            self.page_cache.set(page.url, page.cache_entry)
+        return new_car_count
+
+    def _scrape_all_pages(self, json_url: str, pages: List[int]) -> int:
+        """
+        Fetch every configured page and store them in page order.
+
+        The first page is fetched on its own to learn the page count, so
+        pages past the end of the results are never requested; the rest
+        are fetched concurrently.
 
         Args:
             json_url: JSON endpoint URL
+            pages: Page numbers to fetch
+
+        Returns:
+            Number of new cars found
+        """
+        seen_pages: Dict[FrozenSet[str], int] = {}
+        logger.info(f"Scraping pages {pages}...")
+
+        first = self._fetch_page(json_url, pages[0])
+        new_car_count = self._store_result(first, seen_pages)
+        remaining = [
+            page_num for page_num in pages[1:]
+            if first.number_of_pages is None or page_num <= first.number_of_pages
+        ]
+        if len(remaining) < len(pages) - 1:
+            logger.info(f"Skipping pages past the last page {first.number_of_pages}")
+        if not remaining:
+            return new_car_count
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(remaining)))) as executor:
+            futures = [executor.submit(self._fetch_page, json_url, page_num) for page_num in remaining]
+
+            try:
+                for future in futures:
+                    new_car_count += self._store_result(future.result(), seen_pages)
+            finally:
+                # Drop pages not fetched yet when an earlier page failed
+                for future in futures:
+                    future.cancel()
+
+        return new_car_count
+
+    def _store_result(self, result: PageResult, seen_pages: Dict[FrozenSet[str], int]) -> int:
+        """
+        Store a fetched page unless it is for the wrong page or a repeat.
+
+        Args:
+            result: Fetched page
+            seen_pages: Listing ID sets of the pages fetched this cycle
+
+        Returns:
+            Number of new cars stored
+        """
+        if not result.valid or self._is_duplicate_page(result, seen_pages):
+            return 0
+        return self._store_page(result)
+
+    def _scrape_incremental(self, json_url: str, pages: List[int]) -> int:
+        """
+        Walk pages in order until a page holds only already known listings.
+
+        Listings are sorted newest first, so once a page is entirely known
+        the following pages are too. ``overlap_pages`` more pages are still
+        fetched after that as a safety margin.
+
+        Args:
+            json_url: JSON endpoint URL
+            pages: Page numbers to walk, in order
 
         Returns:
             Number of new cars found
         """
         new_car_count = 0
+        known_ids = db_manager.get_known_ids()
+        remaining_overlap = None
+        seen_pages: Dict[FrozenSet[str], int] = {}
+
+        for page_num in pages:
+            if remaining_overlap is not None:
+                if remaining_overlap <= 0:
+                    logger.info(f"Stopping before page {page_num}: no new listings on previous pages")
+                    break
+                remaining_overlap -= 1
+
+            logger.info(f"Scraping page {page_num}...")
+            result = self._fetch_page(json_url, page_num)
+            if not result.listing_ids:
+                logger.info(f"No listings on page {page_num}, reached the end of the results")
+                break
+            if self._is_duplicate_page(result, seen_pages):
+                break
+
+            all_known = all(car_id in known_ids for car_id in result.listing_ids)
+            new_car_count += self._store_page(result)
+
+            if result.number_of_pages is not None and page_num >= result.number_of_pages:
+                logger.info(f"Page {page_num} is the last page of the results")
+                break
+            if not all_known:
+                remaining_overlap = None
+            elif remaining_overlap is None:
+                remaining_overlap = self.overlap_pages
+
+        return new_car_count
+
+    def scrape_listings(
+        self,
+        json_url: str,
+        pages: Optional[List[int]] = None,
+        mode: Optional[str] = None
+    ) -> int:
+        """
+        Scrape car listings from the JSON endpoint.
+
+        Args:
+            json_url: JSON endpoint URL
+            pages: Page numbers to scrape (defaults to PAGES_TO_SCRAPE)
+            mode: "incremental" or "full" (defaults to SCRAPE_MODE)
+
+        Returns:
+            Number of new cars found
+        """
+        self.last_scrape_failed = False
+        self.last_retry_after = None
+        self.last_endpoint_failed = False
+        pages = list(pages or self.pages_to_scrape)
 
         try:
-            for page_num in self.pages_to_scrape:
-                logger.info(f"Scraping page {page_num}...")
-
-                # Update page number in URL
-                paged_url = json_url.replace("page=1", f"page={page_num}")
-
-                # Make request
-                headers = self._get_random_headers()
-                response = requests.get(paged_url, headers=headers, timeout=30)
-                response.raise_for_status()
-
-                # Parse JSON response
-                json_data = response.json()
-                listings = json_data.get('pageProps', {}).get('listings', [])
-
-                logger.info(f"Found {len(listings)} listings on page {page_num}")
-
-                # Process each listing
-                for listing in listings:
-                    try:
-                        car_info = self._parse_listing(listing)
-                        is_new = db_manager.insert_car(car_info)
-                        if is_new:
-                            new_car_count += 1
-                    except Exception as e:
-                        logger.error(f"Error parsing listing: {e}")
-                        continue
+            if (mode or self.mode) == "incremental":
+                new_car_count = self._scrape_incremental(json_url, pages)
+            else:
+                new_car_count = self._scrape_all_pages(json_url, pages)
 
             logger.info(f"Scraping completed. Found {new_car_count} new cars")
             return new_car_count
 
         except requests.RequestException as e:
+            self.last_scrape_failed = True
+            self.last_retry_after = self._get_retry_after(e)
+            # Throttling says nothing about the endpoint; other error
+            # statuses mean it has to be rediscovered
+            self.last_endpoint_failed = e.response is not None and e.response.status_code not in (429, 503)
             error_message = f"{BOT_NAME} - HTTP request error: {e}"
             logger.error(error_message)
             notifier.send_error(error_message)
             return 0
         except KeyError as e:
+            self.last_scrape_failed = True
+            self.last_endpoint_failed = True
             error_message = f"{BOT_NAME} - JSON parsing error - missing key: {e}"
             logger.error(error_message)
             notifier.send_error(error_message)
             return 0
         except Exception as e:
+            self.last_scrape_failed = True
             error_message = f"{BOT_NAME} - Unexpected error: {e}"
             logger.error(error_message)
             notifier.send_error(error_message)
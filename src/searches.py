@@ -0,0 +1,151 @@
+"""
+Search registry module.
+Loads the named searches monitored by one scraper process.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from src.config import (
+    AUTOSCOUT_SEARCH_URL,
+    PAGES_TO_SCRAPE,
+    SORT_OPTION,
+    SCRAPE_INTERVAL,
+    MIN_SCRAPE_INTERVAL,
+    MAX_SCRAPE_INTERVAL,
+    SCRAPE_MODE,
+    SEARCHES_FILE
+)
+from src.scheduler import AdaptiveScheduler
+from src.utils import setup_logger
+from src import json_codec
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class Search:
+    """
+    A named search with its own pages, sort order and interval.
+
+    Every search keeps its own scheduler, so busy and quiet markets are
+    polled at different rates while sharing the browser, the HTTP session
+    and the database.
+    """
+
+    name: str
+    url: str
+    pages: List[int] = field(default_factory=lambda: list(PAGES_TO_SCRAPE))
+    sort: str = SORT_OPTION
+    interval: float = SCRAPE_INTERVAL
+    mode: str = SCRAPE_MODE
+    min_interval: float = MIN_SCRAPE_INTERVAL
+    max_interval: float = MAX_SCRAPE_INTERVAL
+    scheduler: AdaptiveScheduler = field(init=False, repr=False, compare=False)
+    # Monotonic time the next cycle of this search is due
+    next_run: float = field(default=0.0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.scheduler = AdaptiveScheduler(
+            base_interval=self.interval,
+            min_interval=self.min_interval,
+            max_interval=self.max_interval
+        )
+
+    @property
+    def cache_key(self) -> str:
+        """Key of this search's JSON endpoint in the endpoint cache."""
+        return f"{self.url}#sort={self.sort}"
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> "Search":
+        """
+        Build a search from a registry entry.
+
+        Args:
+            entry: Mapping with ``name`` and ``url`` and optionally ``pages``
+                (list of page numbers or a page count), ``sort``, ``interval``,
+                ``min_interval``, ``max_interval`` and ``mode``; the interval
+                bounds default to MIN/MAX_SCRAPE_INTERVAL, widened to include
+                ``interval``
+
+        Returns:
+            Search
+
+        Raises:
+            ValueError: If the entry is malformed
+        """
+        if not isinstance(entry, dict) or not entry.get("name") or not entry.get("url"):
+            raise ValueError(f"Search entries need a name and a url: {entry!r}")
+
+        pages = entry.get("pages", PAGES_TO_SCRAPE)
+        if isinstance(pages, int):
+            pages = list(range(1, pages + 1))
+        if not pages or not all(isinstance(page, int) and page > 0 for page in pages):
+            raise ValueError(f"Invalid pages for search {entry['name']!r}: {pages!r}")
+
+        mode = entry.get("mode", SCRAPE_MODE)
+        if mode not in ("incremental", "full"):
+            raise ValueError(f"Invalid mode for search {entry['name']!r}: {mode!r}")
+
+        try:
+            interval = float(entry.get("interval", SCRAPE_INTERVAL))
+            min_interval = float(entry.get("min_interval", min(MIN_SCRAPE_INTERVAL, interval)))
+            max_interval = float(entry.get("max_interval", max(MAX_SCRAPE_INTERVAL, interval)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid interval for search {entry['name']!r}: {e}") from e
+        if not 0 < min_interval <= interval <= max_interval:
+            raise ValueError(
+                f"Invalid interval for search {entry['name']!r}: {interval} is not within "
+                f"min_interval {min_interval} and max_interval {max_interval}"
+            )
+
+        return cls(
+            name=str(entry["name"]),
+            url=str(entry["url"]),
+            pages=list(pages),
+            sort=str(entry.get("sort", SORT_OPTION)),
+            interval=interval,
+            mode=mode,
+            min_interval=min_interval,
+            max_interval=max_interval
+        )
+
+
+def load_searches(path: str = SEARCHES_FILE) -> List[Search]:
+    """
+    Load the search registry.
+
+    Without a registry file a single "default" search is built from
+    AUTOSCOUT_SEARCH_URL and the scraping settings.
+
+    Args:
+        path: Path to a JSON file holding a list of search entries
+
+    Returns:
+        Searches to monitor
+
+    Raises:
+        ValueError: If the registry cannot be read or is invalid
+    """
+    if not os.path.exists(path):
+        logger.info(f"No search registry at {path}, using AUTOSCOUT_SEARCH_URL")
+        return [Search(name="default", url=AUTOSCOUT_SEARCH_URL)]
+
+    try:
+        with open(path, "rb") as f:
+            entries = json_codec.load(f)
+    except (OSError,) + json_codec.DECODE_ERRORS as e:
+        raise ValueError(f"Could not read search registry {path}: {e}") from e
+
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"Search registry {path} must be a non-empty list of searches")
+
+    searches = [Search.from_dict(entry) for entry in entries]
+    names = [search.name for search in searches]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate search names in {path}: {', '.join(duplicates)}")
+
+    logger.info(f"Loaded {len(searches)} searches from {path}: {', '.join(names)}")
+    return searches
@@ -0,0 +1,524 @@
+"""
+Storage backend base module.
+Shared bookkeeping for the database backends: change detection through
+in-memory content hashes and prices, batched last_seen touches, retention
+scheduling and new car notifications.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import AbstractSet, Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Type
+from src.config import (
+    DB_TABLE_NAME,
+    RETENTION_DAYS,
+    RETENTION_INTERVAL,
+    RETENTION_ARCHIVE,
+    RETENTION_ARCHIVE_DIR
+)
+from src.utils import setup_logger
+from src.notifier import notifier
+from src.models import CarListing
+from src import json_codec
+
+logger = setup_logger(__name__)
+
+# Schema version shared by all backends (PRAGMA user_version on SQLite)
+SCHEMA_VERSION = 4
+
+# Listing row as built by BaseDatabaseManager._listing_row
+ListingRow = Tuple[Any, ...]
+
+
+class UpsertResult(NamedTuple):
+    """IDs affected by a bulk upsert, split by what happened to them."""
+
+    new_ids: List[str]
+    updated_ids: List[str]
+    unchanged_ids: List[str]
+    # True when the changed listings could not be written
+    failed: bool = False
+
+
+class PriceDrop(NamedTuple):
+    """A listing whose price went down within the queried window."""
+
+    id: str
+    model_and_make: str
+    link: str
+    currency: Optional[str]
+    old_price_cents: int
+    new_price_cents: int
+    drop_cents: int
+
+
+def compute_content_hash(car: CarListing) -> str:
+    """
+    Compute a stable hash over the stored content of a listing.
+
+    Args:
+        car: Car listing
+
+    Returns:
+        Hex digest identifying the listing content
+    """
+    content = json_codec.dumps([
+        car.make,
+        car.model,
+        car.model_version,
+        car.price_text,
+        car.price_cents,
+        car.currency,
+        car.mileage_km,
+        car.registration_year,
+        car.registration_month,
+        car.power_kw,
+        car.fuel.value if car.fuel else None,
+        car.transmission,
+        car.transmission_type.value,
+        car.link,
+        car.image,
+        car.company,
+        car.features
+    ], sort_keys=True)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class BaseDatabaseManager(ABC):
+    """
+    Storage backend for car listings.
+
+    Holds the backend-independent bookkeeping (the in-memory content hash
+    and price maps, pending ``last_seen`` touches, retention scheduling and
+    new car notifications). Subclasses implement the SQL for one database
+    and can be used as context managers.
+    """
+
+    # Exceptions raised by the backend's driver
+    errors: Tuple[Type[Exception], ...] = ()
+    # Whether price changes are detected against the in-memory price map;
+    # backends shared by several processes compare in SQL instead
+    detects_price_changes_in_memory = True
+
+    def __init__(self):
+        """Initialize the shared in-memory state."""
+        self._lock = threading.RLock()
+        # In-memory map of stored ID -> content hash, loaded on first use
+        self._content_hashes: Optional[Dict[str, str]] = None
+        # In-memory map of stored ID -> last recorded price, loaded on first use
+        self._last_prices: Optional[Dict[str, Optional[int]]] = None
+        # IDs seen unchanged this cycle whose last_seen still has to be touched
+        self._pending_seen: Set[str] = set()
+        self._last_retention: Optional[float] = None
+        # Records of the chunk being deleted, appended to the archive file after commit
+        self._unwritten_archive: List[Dict[str, Any]] = []
+
+    def __enter__(self) -> "BaseDatabaseManager":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @abstractmethod
+    def open(self) -> "BaseDatabaseManager":
+        """
+        Connect to the database and make sure the schema is current.
+
+        Returns:
+            The database manager itself
+        """
+
+    @abstractmethod
+    def close(self):
+        """Flush pending writes and release the connection(s)."""
+
+    @abstractmethod
+    def _write_cars(
+        self,
+        rows: List[ListingRow],
+        feature_rows: List[Tuple[str, str, str]],
+        price_rows: List[Tuple[str, int, Optional[str]]]
+    ) -> Set[str]:
+        """
+        Upsert changed listings with their features and price changes in one transaction.
+
+        Args:
+            rows: Listing rows built by :meth:`_listing_row`
+            feature_rows: (listing_id, name, value) rows replacing the stored features
+            price_rows: (listing_id, price_cents, currency) rows to append to the
+                history; without in-memory price change detection these are
+                all written prices, and the backend skips rows equal to the
+                latest recorded price
+
+        Returns:
+            IDs of the written listings that already existed
+        """
+
+    @abstractmethod
+    def _touch_seen(self, car_ids: List[str]):
+        """
+        Set ``last_seen`` of the given listings to now.
+
+        Args:
+            car_ids: IDs of the listings to touch
+        """
+
+    @abstractmethod
+    def _fetch_all(self, query: str) -> List[Tuple[Any, ...]]:
+        """
+        Run a query without parameters and return all rows.
+
+        Args:
+            query: SQL query
+
+        Returns:
+            List of result rows
+        """
+
+    @abstractmethod
+    def _delete_expired_chunk(self, days: int) -> List[str]:
+        """
+        Archive and delete up to RETENTION_BATCH_SIZE expired listings in one transaction.
+
+        Args:
+            days: Number of days threshold
+
+        Returns:
+            IDs of the deleted listings
+        """
+
+    @abstractmethod
+    def get_price_drops(self, hours: int = 24, limit: int = 20) -> List[PriceDrop]:
+        """
+        Get the listings with the largest price drops within the last hours.
+
+        The old price is the last one recorded before the window, or the
+        first one recorded inside it for listings that appeared since.
+
+        Args:
+            hours: Size of the window in hours
+            limit: Maximum number of listings to return
+
+        Returns:
+            Price drops ordered by the largest absolute drop first
+        """
+
+    @staticmethod
+    def _listing_row(car: CarListing, content_hash: str) -> ListingRow:
+        """
+        Build the column values stored for a listing.
+
+        Args:
+            car: Car listing
+            content_hash: Hash of the listing content
+
+        Returns:
+            Tuple of column values
+        """
+        return (
+            car.id,
+            car.make,
+            car.model,
+            car.model_version,
+            car.model_and_make,
+            car.price_text,
+            car.price_cents,
+            car.currency,
+            car.mileage_km,
+            car.registration_year,
+            car.registration_month,
+            car.power_kw,
+            car.fuel.value if car.fuel else None,
+            car.transmission,
+            car.transmission_type.value,
+            car.link,
+            car.image,
+            car.company,
+            content_hash
+        )
+
+    def insert_car(self, car: CarListing) -> bool:
+        """
+        Insert or update a car listing in the database.
+
+        Args:
+            car: Car listing to store
+
+        Returns:
+            True if inserted (new car), False if updated (existing car)
+        """
+        return bool(self.upsert_cars([car]).new_ids)
+
+    def upsert_cars(self, cars: Iterable[CarListing]) -> UpsertResult:
+        """
+        Insert or update a batch of car listings in a single transaction.
+
+        Listings whose content hash matches the stored one are not written;
+        their ``last_seen`` is touched in bulk by :meth:`flush_seen`.
+
+        Args:
+            cars: Iterable of car listings
+
+        Returns:
+            UpsertResult with the IDs that were inserted, updated and
+            unchanged, and whether the write failed
+        """
+        # Deduplicate by ID so a listing repeated within the batch is written once
+        batch = {car.id: car for car in cars}
+        if not batch:
+            return UpsertResult([], [], [])
+
+        with self._lock:
+            stored_hashes = self._get_content_hashes()
+            last_prices = self._get_last_prices() if self.detects_price_changes_in_memory else {}
+            changed = {}
+            unchanged_ids = []
+            rows = []
+            feature_rows = []
+            price_rows: List[Tuple[str, int, Optional[str]]] = []
+            for car_id, car in batch.items():
+                content_hash = compute_content_hash(car)
+                if stored_hashes.get(car_id) == content_hash:
+                    unchanged_ids.append(car_id)
+                    continue
+                changed[car_id] = content_hash
+                rows.append(self._listing_row(car, content_hash))
+                feature_rows.extend((car.id, name, str(value)) for name, value in car.features.items())
+                if car.price_cents is not None and (
+                    not self.detects_price_changes_in_memory or last_prices.get(car_id) != car.price_cents
+                ):
+                    price_rows.append((car.id, car.price_cents, car.currency))
+            self._pending_seen.update(unchanged_ids)
+
+            if not changed:
+                logger.debug(f"All {len(batch)} cars unchanged, nothing to write")
+                return UpsertResult([], [], unchanged_ids)
+
+            try:
+                existing = self._write_cars(rows, feature_rows, price_rows)
+            except self.errors as e:
+                error_msg = f"Database insertion error: {e}"
+                logger.error(error_msg)
+                notifier.send_error(error_msg)
+                return UpsertResult([], [], unchanged_ids, failed=True)
+
+            stored_hashes.update(changed)
+            last_prices.update((car_id, price_cents) for car_id, price_cents, _ in price_rows)
+
+        result = UpsertResult(
+            new_ids=[car_id for car_id in changed if car_id not in existing],
+            updated_ids=[car_id for car_id in changed if car_id in existing],
+            unchanged_ids=unchanged_ids
+        )
+        logger.debug(
+            f"Upserted {len(batch)} cars: {len(result.new_ids)} new, "
+            f"{len(result.updated_ids)} updated, {len(result.unchanged_ids)} unchanged"
+        )
+
+        # Notify only after the transaction has been committed
+        for car_id in result.new_ids:
+            car = batch[car_id]
+            logger.info(f"New car added: {car.model_and_make} - {car.price_text}")
+            notifier.send_new_car(
+                f"<b>{car.model_and_make}</b>\n"
+                f"Price: {car.price_text}\n"
+                f"Transmission: {car.transmission}\n"
+                f"<a href='{car.link}'>View Listing</a>"
+            )
+
+        return result
+
+    def mark_seen(self, car_ids: Iterable[str]):
+        """
+        Record listings as seen without comparing their content.
+
+        Their ``last_seen`` is touched by the next :meth:`flush_seen`.
+
+        Args:
+            car_ids: IDs of listings seen unchanged
+        """
+        with self._lock:
+            self._pending_seen.update(car_ids)
+
+    def flush_seen(self) -> int:
+        """
+        Touch ``last_seen`` for listings seen unchanged since the last flush.
+
+        Returns:
+            Number of listings touched
+        """
+        with self._lock:
+            if not self._pending_seen:
+                return 0
+            car_ids = list(self._pending_seen)
+            try:
+                self._touch_seen(car_ids)
+            except self.errors as e:
+                logger.error(f"Database last_seen update error: {e}")
+                return 0
+            self._pending_seen.clear()
+            logger.debug(f"Touched last_seen of {len(car_ids)} unchanged cars")
+            return len(car_ids)
+
+    def _get_content_hashes(self) -> Dict[str, str]:
+        """
+        Get the in-memory map of stored IDs to content hashes.
+
+        The map is loaded from the database once and kept in sync by
+        :meth:`upsert_cars`, so repeated calls are cheap.
+
+        Returns:
+            Dictionary of content hashes keyed by car ID
+        """
+        with self._lock:
+            if self._content_hashes is None:
+                try:
+                    self._content_hashes = dict(self._fetch_all(f"SELECT id, content_hash FROM {DB_TABLE_NAME}"))
+                except self.errors as e:
+                    logger.error(f"Database hash lookup error: {e}")
+                    return {}
+            return self._content_hashes
+
+    def _get_last_prices(self) -> Dict[str, Optional[int]]:
+        """
+        Get the in-memory map of stored IDs to their last recorded price.
+
+        The map is loaded from the database once and kept in sync by
+        :meth:`upsert_cars`, so price changes are detected without a query.
+
+        Returns:
+            Dictionary of prices in cents keyed by car ID
+        """
+        with self._lock:
+            if self._last_prices is None:
+                try:
+                    self._last_prices = dict(self._fetch_all(f"SELECT id, price_cents FROM {DB_TABLE_NAME}"))
+                except self.errors as e:
+                    logger.error(f"Database price lookup error: {e}")
+                    return {}
+            return self._last_prices
+
+    def get_known_ids(self) -> AbstractSet[str]:
+        """
+        Get the IDs of all stored car listings.
+
+        Returns:
+            Set-like view of stored car IDs
+        """
+        return self._get_content_hashes().keys()
+
+    def run_retention(self, force: bool = False) -> int:
+        """
+        Remove expired listings if RETENTION_INTERVAL has passed since the last run.
+
+        Args:
+            force: Run even if the interval has not passed yet
+
+        Returns:
+            Number of removed records
+        """
+        now = time.monotonic()
+        if not force and self._last_retention is not None and now - self._last_retention < RETENTION_INTERVAL:
+            return 0
+        self._last_retention = now
+        return self.delete_old_cars(days=RETENTION_DAYS)
+
+    def delete_old_cars(self, days: int = 7) -> int:
+        """
+        Delete car listings not seen for more than the specified days.
+
+        Rows are removed in chunks of RETENTION_BATCH_SIZE, each in its own
+        short transaction, so the write lock is never held for long. With
+        RETENTION_ARCHIVE set, rows are archived as they are deleted; the
+        archive file is only appended to once a chunk's transaction has
+        committed, so a failed chunk is not archived twice.
+
+        Args:
+            days: Number of days threshold
+
+        Returns:
+            Number of deleted records
+        """
+        deleted_count = 0
+        try:
+            while True:
+                with self._lock:
+                    self._unwritten_archive = []
+                    car_ids = self._delete_expired_chunk(days)
+                    if not car_ids:
+                        break
+                    for cache in (self._content_hashes, self._last_prices):
+                        if cache is not None:
+                            for car_id in car_ids:
+                                cache.pop(car_id, None)
+                    self._pending_seen.difference_update(car_ids)
+                    self._write_archive_file()
+                deleted_count += len(car_ids)
+
+            return deleted_count
+        except self.errors + (OSError,) as e:
+            error_msg = f"Database deletion error: {e}"
+            logger.error(error_msg)
+            notifier.send_error(error_msg)
+            return deleted_count
+        finally:
+            self._unwritten_archive = []
+
+    def _archive_records(self, records: Dict[str, Dict[str, Any]]) -> List[Tuple[str, bytes]]:
+        """
+        Archive listings that are about to be deleted.
+
+        In "table" mode the rows for the archive table are returned so the
+        backend can insert them in the deleting transaction; in "file" mode
+        the records are kept until :meth:`_write_archive_file` appends them
+        after the transaction has committed.
+
+        Args:
+            records: Listing columns plus their features, keyed by ID
+
+        Returns:
+            (id, compressed payload) rows for the archive table
+        """
+        if RETENTION_ARCHIVE == "table":
+            return [
+                (car_id, zlib.compress(json_codec.dumps(record).encode("utf-8")))
+                for car_id, record in records.items()
+            ]
+        if RETENTION_ARCHIVE == "file":
+            self._unwritten_archive.extend(records.values())
+        else:
+            logger.warning(f"Unknown RETENTION_ARCHIVE mode {RETENTION_ARCHIVE!r}, not archiving")
+        return []
+
+    def _write_archive_file(self):
+        """Append the records of a committed chunk to the monthly archive file."""
+        if not self._unwritten_archive:
+            return
+        os.makedirs(RETENTION_ARCHIVE_DIR, exist_ok=True)
+        archive_file = os.path.join(
+            RETENTION_ARCHIVE_DIR,
+            f"{DB_TABLE_NAME}-{datetime.now(timezone.utc):%Y-%m}.jsonl.gz"
+        )
+        with gzip.open(archive_file, "at", encoding="utf-8") as f:
+            for record in self._unwritten_archive:
+                f.write(json_codec.dumps(record) + "\n")
+        self._unwritten_archive = []
+
+    def get_car_count(self) -> int:
+        """
+        Get total number of cars in database.
+
+        Returns:
+            Number of car listings
+        """
+        try:
+            with self._lock:
+                return self._fetch_all(f"SELECT COUNT(*) FROM {DB_TABLE_NAME}")[0][0]
+        except self.errors as e:
+            logger.error(f"Database count error: {e}")
+            return 0
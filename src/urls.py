@@ -0,0 +1,79 @@
+"""
+URL handling module.
+Reads and rewrites query parameters of search and lst.json URLs.
+"""
+
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def get_query_param(url: str, name: str) -> Optional[str]:
+    """
+    Get the first value of a query parameter.
+
+    Args:
+        url: URL to read
+        name: Parameter name
+
+    Returns:
+        Parameter value, or None if the URL does not have it
+    """
+    for key, value in parse_qsl(urlsplit(url).query, keep_blank_values=True):
+        if key == name:
+            return value
+    return None
+
+
+def set_query_params(url: str, **params: str) -> str:
+    """
+    Set query parameters, replacing any existing values.
+
+    Other parameters keep their order and repeated values; new parameters
+    are appended.
+
+    Args:
+        url: URL to rewrite
+        **params: Parameter values to set
+
+    Returns:
+        Rewritten URL
+    """
+    parts = urlsplit(url)
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in params
+    ]
+    query.extend((key, str(value)) for key, value in params.items())
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def with_page(url: str, page: int) -> str:
+    """
+    Point a lst.json URL at another result page.
+
+    Args:
+        url: lst.json URL
+        page: Page number
+
+    Returns:
+        URL of the requested page
+    """
+    return set_query_params(url, page=str(page))
+
+
+def parse_page_number(value) -> Optional[int]:
+    """
+    Interpret a page number reported by the site.
+
+    Args:
+        value: Page number as int, float or numeric string
+
+    Returns:
+        Page number, or None if the value is not a positive number
+    """
+    try:
+        page = int(value)
+    except (TypeError, ValueError):
+        return None
+    return page if page > 0 else None
@@ -3,7 +3,80 @@ Utility functions and logging setup.
 """
 
 import logging
+import re
+from functools import lru_cache, wraps
+from typing import Any, Callable, Optional, Tuple, TypeVar, Union
 from src.config import LOG_LEVEL, LOG_FORMAT, LOG_FILE
+from src.models import FuelType, Transmission
+
+# Precompiled parsers for locale-formatted detail strings. A ".", ",", "'",
+# "’" or space followed by exactly three digits groups thousands
+# ("12.990", "12,990", "9'990"); one or two trailing digits are a fraction
+_GROUPED_INT = r"\d{1,3}(?:[.,'\u2019\s\u00a0]\d{3}(?!\d))+|\d+"
+_PRICE_PATTERN = re.compile(rf"({_GROUPED_INT})(?:[.,](\d{{1,2}}(?!\d)|[-\u2013]))?")
+_MILEAGE_PATTERN = re.compile(rf"({_GROUPED_INT})\s*km", re.IGNORECASE)
+_AMOUNT_PATTERN = re.compile(r"\s*(\d+)(?:\.(\d{1,2}))?\s*")
+_POWER_KW_PATTERN = re.compile(r"(\d+)\s*kW", re.IGNORECASE)
+_REGISTRATION_PATTERN = re.compile(r"(?:(\d{1,2})\s*[/.-]\s*)?((?:19|20)\d{2})")
+
+# Detail strings repeat across listings, so parsed values are cached
+_PARSE_CACHE_SIZE = 4096
+
+# Detail values are display strings, but tracking data may hold plain numbers
+DetailValue = Union[str, int, float, None]
+
+_T = TypeVar("_T")
+
+_CURRENCY_SYMBOLS = {
+    "€": "EUR",
+    "EUR": "EUR",
+    "CHF": "CHF",
+    "£": "GBP",
+    "GBP": "GBP",
+    "$": "USD",
+    "USD": "USD"
+}
+
+# Display names and AutoScout24 tracking codes for fuel types
+_FUEL_TYPES = {
+    "b": FuelType.PETROL,
+    "benzin": FuelType.PETROL,
+    "gasoline": FuelType.PETROL,
+    "petrol": FuelType.PETROL,
+    "d": FuelType.DIESEL,
+    "diesel": FuelType.DIESEL,
+    "e": FuelType.ELECTRIC,
+    "elektro": FuelType.ELECTRIC,
+    "electric": FuelType.ELECTRIC,
+    "2": FuelType.HYBRID_PETROL,
+    "elektro/benzin": FuelType.HYBRID_PETROL,
+    "electric/gasoline": FuelType.HYBRID_PETROL,
+    "3": FuelType.HYBRID_DIESEL,
+    "elektro/diesel": FuelType.HYBRID_DIESEL,
+    "electric/diesel": FuelType.HYBRID_DIESEL,
+    "l": FuelType.LPG,
+    "autogas (lpg)": FuelType.LPG,
+    "lpg": FuelType.LPG,
+    "c": FuelType.CNG,
+    "erdgas (cng)": FuelType.CNG,
+    "cng": FuelType.CNG,
+    "h": FuelType.HYDROGEN,
+    "wasserstoff": FuelType.HYDROGEN,
+    "hydrogen": FuelType.HYDROGEN,
+    "m": FuelType.ETHANOL,
+    "ethanol": FuelType.ETHANOL
+}
+
+_TRANSMISSIONS = {
+    "automatik": Transmission.AUTOMATIC,
+    "automatic": Transmission.AUTOMATIC,
+    "schaltgetriebe": Transmission.MANUAL,
+    "manuell": Transmission.MANUAL,
+    "manual": Transmission.MANUAL,
+    "halbautomatik": Transmission.SEMI_AUTOMATIC,
+    "semi-automatic": Transmission.SEMI_AUTOMATIC
+}
+
 
 def setup_logger(name: str) -> logging.Logger:
     """
@@ -68,6 +141,192 @@ def extract_vehicle_features(vehicle_details: list) -> dict:
     return features
 
 
+def _as_text(value: Any) -> Optional[str]:
+    """
+    Coerce a detail value to the string form the normalizers parse.
+
+    Args:
+        value: Display string, plain number or anything else found in the data
+
+    Returns:
+        The string, numbers written without a fraction where possible, or
+        None for values that cannot be interpreted
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else str(value)
+    return None
+
+
+def _cached_parser(func: Callable[[Optional[str]], _T]) -> Callable[[DetailValue], _T]:
+    """
+    Cache a normalizer and let it accept numbers as well as strings.
+
+    Values are coerced with :func:`_as_text` before the cache lookup, so
+    unhashable or non-string input never reaches the parser.
+
+    Args:
+        func: Normalizer taking a detail string
+
+    Returns:
+        Cached normalizer taking any detail value
+    """
+    cached = lru_cache(maxsize=_PARSE_CACHE_SIZE)(func)
+
+    @wraps(func)
+    def wrapper(value: DetailValue) -> _T:
+        return cached(_as_text(value))
+
+    return wrapper
+
+
+def _parse_grouped_int(text: str) -> int:
+    """Parse an integer written with thousands separators, e.g. "12.990"."""
+    return int(re.sub(r"\D", "", text))
+
+
+@_cached_parser
+def normalize_price(price_text: Optional[str]) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Normalize a displayed price such as "€ 12.990,-", "€ 12,990" or "CHF 9'990.–".
+
+    Args:
+        price_text: Price as displayed on AutoScout24
+
+    Returns:
+        Tuple of price in cents and ISO currency code (None if unknown)
+    """
+    if not price_text:
+        return None, None
+
+    currency = None
+    for symbol, code in _CURRENCY_SYMBOLS.items():
+        if symbol in price_text:
+            currency = code
+            break
+
+    match = _PRICE_PATTERN.search(price_text)
+    if not match:
+        return None, currency
+
+    cents = _parse_grouped_int(match.group(1)) * 100
+    fraction = match.group(2)
+    if fraction and fraction.isdigit():
+        cents += int(fraction.ljust(2, "0"))
+    return cents, currency
+
+
+@_cached_parser
+def normalize_amount(text: Optional[str]) -> Optional[int]:
+    """
+    Normalize a plain amount in whole currency units, such as 12990 or "12990.50".
+
+    Args:
+        text: Amount as a number or numeric string
+
+    Returns:
+        Amount in cents, or None if the value is not a plain amount
+    """
+    match = _AMOUNT_PATTERN.fullmatch(text or "")
+    if not match:
+        return None
+    cents = int(match.group(1)) * 100
+    if match.group(2):
+        cents += int(match.group(2).ljust(2, "0"))
+    return cents
+
+
+@_cached_parser
+def normalize_mileage(text: Optional[str]) -> Optional[int]:
+    """
+    Normalize a mileage such as "12.000 km" or a plain number of kilometres.
+
+    Args:
+        text: Mileage string or number of kilometres
+
+    Returns:
+        Mileage in km, or None if unknown
+    """
+    if not text:
+        return None
+    if text.isdigit():
+        return int(text)
+    match = _MILEAGE_PATTERN.search(text)
+    return _parse_grouped_int(match.group(1)) if match else None
+
+
+@_cached_parser
+def normalize_power_kw(text: Optional[str]) -> Optional[int]:
+    """
+    Normalize a power string such as "110 kW (150 PS)".
+
+    Args:
+        text: Power string
+
+    Returns:
+        Power in kW, or None if unknown
+    """
+    match = _POWER_KW_PATTERN.search(text or "")
+    return int(match.group(1)) if match else None
+
+
+@_cached_parser
+def normalize_registration(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Normalize a first registration such as "05/2019", "05-2019" or "2019".
+
+    Args:
+        text: First registration string
+
+    Returns:
+        Tuple of year and month (None if unknown)
+    """
+    match = _REGISTRATION_PATTERN.search(text or "")
+    if not match:
+        return None, None
+    month = int(match.group(1)) if match.group(1) else None
+    if month is not None and not 1 <= month <= 12:
+        month = None
+    return int(match.group(2)), month
+
+
+@_cached_parser
+def normalize_fuel(text: Optional[str]) -> Optional[FuelType]:
+    """
+    Normalize a fuel type name or AutoScout24 fuel code.
+
+    Args:
+        text: Fuel display name or code
+
+    Returns:
+        Fuel type, or None if unknown
+    """
+    if not text:
+        return None
+    return _FUEL_TYPES.get(text.strip().lower(), FuelType.OTHER)
+
+
+@_cached_parser
+def normalize_transmission(text: Optional[str]) -> Transmission:
+    """
+    Normalize a transmission name.
+
+    Args:
+        text: Transmission display name
+
+    Returns:
+        Transmission type
+    """
+    if not text:
+        return Transmission.UNKNOWN
+    return _TRANSMISSIONS.get(text.strip().lower(), Transmission.UNKNOWN)
+
+
 def build_car_url(listing_url: str) -> str:
     """
     Build full car URL from listing URL.
@@ -0,0 +1,90 @@
+"""
+Tests for the detail string normalizers.
+"""
+
+import pytest
+
+from src.models import FuelType, Transmission
+from src.utils import (
+    normalize_amount,
+    normalize_fuel,
+    normalize_mileage,
+    normalize_power_kw,
+    normalize_price,
+    normalize_registration,
+    normalize_transmission
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("€ 12.990,-", (1299000, "EUR")),
+    ("€ 12.990,50", (1299050, "EUR")),
+    ("€ 12,990", (1299000, "EUR")),
+    ("€ 12 990", (1299000, "EUR")),
+    ("€ 12.990,-", (1299000, "EUR")),
+    ("€ 1.234.567,-", (123456700, "EUR")),
+    ("€ 990,-", (99000, "EUR")),
+    ("€ 12990", (1299000, "EUR")),
+    ("CHF 9'990.–", (999000, "CHF")),
+    ("CHF 9’990.–", (999000, "CHF")),
+    ("CHF 12'990.50", (1299050, "CHF")),
+    ("$12,990.99", (1299099, "USD")),
+    ("£ 1,234,567", (123456700, "GBP")),
+    ("12.5 EUR", (1250, "EUR")),
+    ("Preis auf Anfrage", (None, None)),
+    ("", (None, None)),
+    (None, (None, None)),
+])
+def test_normalize_price(text, expected):
+    assert normalize_price(text) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (12990, 1299000),
+    (12990.0, 1299000),
+    ("12990", 1299000),
+    ("12990.5", 1299050),
+    # Tracking amounts are unformatted, so grouped numbers are rejected
+    ("12.990", None),
+    ("12,990", None),
+    ("1e5", None),
+    (True, None),
+    ([12990], None),
+    (None, None),
+])
+def test_normalize_amount(value, expected):
+    assert normalize_amount(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("12.000 km", 12000),
+    ("12,000 km", 12000),
+    ("12'000 km", 12000),
+    ("12 000 km", 12000),
+    ("120.500 KM", 120500),
+    ("12000", 12000),
+    (12000, 12000),
+    (12000.0, 12000),
+    ("- km", None),
+    ({"value": 12000}, None),
+    (None, None),
+])
+def test_normalize_mileage(value, expected):
+    assert normalize_mileage(value) == expected
+
+
+@pytest.mark.parametrize("function, value, expected", [
+    (normalize_power_kw, "110 kW (150 PS)", 110),
+    (normalize_power_kw, None, None),
+    (normalize_registration, "05/2019", (2019, 5)),
+    (normalize_registration, "05-2019", (2019, 5)),
+    (normalize_registration, 2019, (2019, None)),
+    (normalize_registration, "13/2019", (2019, None)),
+    (normalize_fuel, "Benzin", FuelType.PETROL),
+    (normalize_fuel, "d", FuelType.DIESEL),
+    (normalize_fuel, None, None),
+    (normalize_transmission, "Automatik", Transmission.AUTOMATIC),
+    (normalize_transmission, None, Transmission.UNKNOWN),
+])
+def test_other_normalizers(function, value, expected):
+    assert function(value) == expected